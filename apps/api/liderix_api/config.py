@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Dict
 
 class Settings(BaseSettings):
     # 🔐 JWT
@@ -14,6 +15,73 @@ class Settings(BaseSettings):
     # 🔹 Клиентская БД ITStep
     ITSTEP_DB_URL: str
 
+    # 🏊 Пулы соединений (одинаковые для каждой базы, см. engines.py)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800   # сек; пересоздавать соединения старше (PgBouncer / idle timeout)
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_WARMUP: int = 2       # соединений на пул, открываемых при старте
+    DB_POOL_PRE_PING: bool = False        # SELECT 1 на каждый checkout; вместо него — фоновая проверка
+    DB_POOL_CHECK_SECONDS: float = 30.0   # период проверки простаивающих соединений; 0 — выключить
+    DB_POOL_CHECK_TIMEOUT: float = 2.0    # соединение, не ответившее за это время, закрывается
+
+    # 📖 Реплики для чтения (GET-роуты аналитики и списков); пусто — читаем с primary
+    LIDERIX_REPLICA_DB_URL: str = ""
+    ITSTEP_REPLICA_DB_URL: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 30.0     # отставание больше — читаем с primary; 0 — не проверять
+    REPLICA_CHECK_SECONDS: float = 10.0       # период фоновой проверки реплик
+    REPLICA_CONNECT_TIMEOUT: float = 2.0      # быстрый отказ, чтобы уйти на primary
+    REPLICA_LAG_SQL: str = ""                 # свой запрос отставания в секундах; пусто — по pg_last_xact_replay_timestamp
+
+    # 🧷 Кэш prepared statements asyncpg на соединение (запросы из queries/ переиспользуют план)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
+    # 🏷 client_id клиента ITStep — его БД обслуживает общий пул itstep (engines.py);
+    # он же клиент по умолчанию, если запрос клиента не указал
+    ITSTEP_CLIENT_ID: str = "abc2ac2e-d352-453f-85f9-b7d078549fa3"
+
+    # 🏢 Остальные клиентские БД: client_id → DSN (JSON в .env), движки — tenants.py
+    CLIENT_DB_URLS: Dict[str, str] = {}
+    TENANT_HEADER: str = "X-Client-Id"
+    TENANT_MAX_ENGINES: int = 32           # LRU движков клиентов в процессе
+    TENANT_POOL_SIZE: int = 2
+    TENANT_MAX_OVERFLOW: int = 3
+    TENANT_MAX_CONNECTIONS: int = 100      # потолок соединений по всем пулам клиентов
+    TENANT_IDLE_SECONDS: float = 600.0     # движок без запросов дольше — закрывается
+
+    # 🗄 Кэш ответов поверх MV (сбрасывается при обновлении витрин)
+    MV_CACHE_MAX_ENTRIES: int = 512
+    MV_CACHE_MAX_ROWS: int = 200_000   # суммарно строк во всех записях — грубая граница по памяти
+    MV_CACHE_TTL_SECONDS: int = 900    # страховка, если опрос версии витрин недоступен
+    MV_REFRESH_POLL_SECONDS: float = 30.0
+    MV_REFRESH_VERSION_SQL: str = ""   # свой запрос версии данных (напр. из таблицы логов refresh); пусто — по pg_class/pg_stat
+    DAY_CACHE_MAX_DAYS: int = 20_000   # записей (client, dataset, день) в посуточном кэше
+    DAY_CACHE_MAX_ROWS: int = 500_000
+
+    # 📡 Push новых инсайтов (SSE)
+    INSIGHTS_POLL_SECONDS: float = 15.0      # один опрос ai.agent_insights на процесс
+    INSIGHTS_SSE_HEARTBEAT_SECONDS: float = 20.0
+    INSIGHTS_SUBSCRIBER_QUEUE: int = 16      # событий в очереди медленного подписчика
+    INSIGHTS_FEED_OVERLAP_SECONDS: float = 120.0  # перечитываемое окно до водяного знака (поздние коммиты)
+
+    # 📊 Дашборд
+    DASHBOARD_PANEL_TIMEOUT: float = 10.0  # секунд на одну панель в /dashboard/summary
+    ADS_SECTION_TIMEOUT: float = 10.0      # секунд на одну секцию в /analytics/ads
+
+    # 🔮 Ночной пакет прогнозов по всем клиентам (прогрев кэша /analytics/forecast)
+    FORECAST_BATCH_HOUR: int = 6        # час запуска, локальное время; -1 — выключить
+    FORECAST_BATCH_HORIZON: int = 14    # как значения по умолчанию у роута
+    FORECAST_BATCH_HISTORY: int = 180
+
+    # 🚨 Пакет аномалий по всем клиентам (пересчёт после каждого refresh витрин)
+    ANOMALY_SCAN_SECONDS: float = 30.0  # как часто искать клиентов без результата в кэше
+    ANOMALY_SCAN_DAYS: int = 365        # максимум days у /analytics/anomalies
+    ANOMALY_SCAN_HISTORY: int = 120     # дней истории перед окном для детекторов
+    ANOMALY_MIN_SCORE: float = 2.0      # точки с меньшим |score| в кэш не попадают — минимум threshold
+
+    # 📤 Выгрузки
+    EXPORT_CHUNK_ROWS: int = 5000  # строк на одну порцию серверного курсора
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
@@ -1,9 +1,10 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase
 from fastapi import Depends
 from typing import AsyncGenerator
 
 from liderix_api.config import settings
+from liderix_api.engines import engines
 
 # 🎯 Основной URL БД загружается из .env
 DATABASE_URL = settings.LIDERIX_DB_URL
@@ -12,11 +13,16 @@ DATABASE_URL = settings.LIDERIX_DB_URL
 class Base(DeclarativeBase):
     pass
 
-# ⚙️ Создание движка и асинхронной сессии
-engine = create_async_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
-MainAsyncSession = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# ⚙️ Движок и сессия — общий пул из реестра engines
+engine = engines.engine("liderix")
+MainAsyncSession = engines.sessionmaker("liderix")
 
 # 📥 Зависимость FastAPI
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with MainAsyncSession() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+# 📖 Зависимость для GET-роутов: реплика, при её недоступности — primary
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with engines.read_session("liderix") as session:
+        yield session
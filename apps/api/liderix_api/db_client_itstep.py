@@ -1,10 +1,12 @@
 # apps/api/liderix_api/db_client_itstep.py
 
 from typing import AsyncGenerator, Callable
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase
 
 from liderix_api.config import settings
+from liderix_api.engines import engines
+from liderix_api.tenants import get_tenant_read_session, get_tenant_session, tenants
 
 # 🔹 URL клиентской БД (например, ITStep)
 ITSTEP_DB_URL = settings.ITSTEP_DB_URL
@@ -13,18 +15,20 @@ ITSTEP_DB_URL = settings.ITSTEP_DB_URL
 class ClientBase(DeclarativeBase):
     pass
 
-# 🔧 Движок и сессия (ITStep client DB)
-engine_itstep = create_async_engine(ITSTEP_DB_URL, echo=False, pool_pre_ping=True)
-SessionItstep = sessionmaker(engine_itstep, class_=AsyncSession, expire_on_commit=False)
+# 🔧 Движок и сессия (ITStep client DB) — общий пул из реестра engines
+engine_itstep = engines.engine("itstep")
+SessionItstep = engines.sessionmaker("itstep")
+# 📖 Чтение ITStep: реплика, при её недоступности или отставании — primary
+SessionItstepRead = engines.read_sessionmaker("itstep")
 
-# 📦 Dependency — стандартное подключение
-async def get_client_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionItstep() as session:
-        yield session
+# 📦 Dependency — БД клиента текущего запроса (TenantMiddleware → current_client)
+get_client_async_session = get_tenant_session
+# 📖 То же для GET-роутов аналитики — с реплики
+get_client_read_session = get_tenant_read_session
 
-# 📦 Dependency по client_id (на будущее)
+# 📦 Dependency для явно указанного клиента
 def get_client_session_by_client_id(client_id: str) -> Callable[[], AsyncGenerator[AsyncSession, None]]:
     async def _get_session() -> AsyncGenerator[AsyncSession, None]:
-        async with SessionItstep() as session:
+        async with tenants.sessionmaker(client_id)() as session:
             yield session
     return _get_session
\ No newline at end of file
@@ -0,0 +1,432 @@
+# apps/api/liderix_api/engines.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from liderix_api.config import settings
+
+# Отставание реплики в секундах. Без новых транзакций на primary
+# pg_last_xact_replay_timestamp() стареет, хотя реплика догнала его —
+# поэтому при совпадении принятого и применённого WAL отставание 0.
+DEFAULT_LAG_SQL = """
+    SELECT CASE
+      WHEN NOT pg_is_in_recovery() THEN 0
+      WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+      ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END::float8
+"""
+
+# Ошибки подключения к реплике, после которых читаем с primary
+REPLICA_ERRORS = (OSError, asyncio.TimeoutError, SQLAlchemyError)
+
+
+class ReadSession(AsyncSession):
+    """
+    Сессия только для чтения: реплика, если она жива и не отстала, иначе
+    primary. Выбор — при первом обращении к БД, а не при создании: сессия,
+    которая так и не понадобилась (ответ из кэша, зависимость роутера),
+    соединение из пула не держит. Не удалось подключиться к реплике —
+    тот же запрос уходит на primary.
+    """
+
+    def __init__(self, registry: "EngineRegistry", name: str, **kw: Any):
+        super().__init__(bind=registry.engine(name), expire_on_commit=False, **kw)
+        self._registry = registry
+        self._name = name
+        self._routed = False
+
+    async def _route(self) -> None:
+        if self._routed:
+            return
+        self._routed = True
+        if not self._registry.replica_available(self._name):
+            return
+        primary = self.sync_session.bind
+        self.sync_session.bind = self._registry.replica_engine(self._name).sync_engine
+        try:
+            await super().connection()
+        except REPLICA_ERRORS as e:
+            await super().close()
+            self.sync_session.bind = primary
+            self._registry.mark_replica(self._name, False, repr(e))
+
+    async def connection(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().connection(*args, **kw)
+
+    async def execute(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().execute(*args, **kw)
+
+    async def scalar(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().scalar(*args, **kw)
+
+    async def scalars(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().scalars(*args, **kw)
+
+    async def get(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().get(*args, **kw)
+
+    async def stream(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().stream(*args, **kw)
+
+    async def stream_scalars(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().stream_scalars(*args, **kw)
+
+    def begin(self):
+        return _RoutedTransaction(self, super().begin())
+
+    def begin_nested(self):
+        return _RoutedTransaction(self, super().begin_nested())
+
+
+class _RoutedTransaction:
+    """begin() / begin_nested() ReadSession: сначала выбор базы, затем транзакция."""
+
+    def __init__(self, session: ReadSession, transaction: Any):
+        self.session = session
+        self.transaction = transaction
+
+    async def __aenter__(self):
+        await self.session._route()
+        return await self.transaction.__aenter__()
+
+    async def __aexit__(self, *exc: Any):
+        return await self.transaction.__aexit__(*exc)
+
+
+class EngineRegistry:
+    """
+    Один движок (и один пул соединений) на каждую базу в процессе.
+    db.py, db_client_itstep.py и main.py берут движки и фабрики сессий
+    только отсюда — второго пула к той же базе не появляется.
+    """
+
+    def __init__(self):
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._sessions: Dict[str, sessionmaker] = {}
+        self._replicas: Dict[str, str] = {}         # primary → имя движка реплики
+        self._replica_ok: Dict[str, bool] = {}
+        self.replica_lag: Dict[str, Optional[float]] = {}
+        self._tracked: Dict[str, AsyncEngine] = {}   # пулы под фоновой проверкой
+        self.pool_stats: Dict[str, Dict[str, int]] = {}
+
+    def register(self, name: str, url: str, replica_url: str = "", **engine_kwargs: Any) -> AsyncEngine:
+        """
+        Регистрирует движок базы. С replica_url рядом регистрируется
+        "<name>.replica" — его берут read_session / read_sessionmaker.
+        """
+        if replica_url:
+            replica_kwargs = dict(engine_kwargs)
+            connect_args = dict(replica_kwargs.pop("connect_args", {}))
+            connect_args.setdefault("timeout", settings.REPLICA_CONNECT_TIMEOUT)
+            self.register(f"{name}.replica", replica_url, connect_args=connect_args, **replica_kwargs)
+            self._replicas[name] = f"{name}.replica"
+            self._replica_ok[name] = True
+            self.replica_lag[name] = None
+        if name in self._engines:
+            raise ValueError(f"Engine '{name}' is already registered")
+        options = dict(
+            echo=False,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        options.update(engine_kwargs)
+        engine = create_async_engine(url, **options)
+        self._engines[name] = engine
+        self._sessions[name] = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self.track(name, engine)
+        return engine
+
+    def track(self, name: str, engine: AsyncEngine) -> None:
+        """
+        Ставит пул под фоновую проверку (PoolHealthChecker) и считает
+        обрывы соединений, случившиеся прямо в запросах.
+        """
+        self._tracked[name] = engine
+        stats = self.pool_stats.setdefault(name, {"validated": 0, "dead": 0, "disconnects": 0})
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def _on_error(context) -> None:
+            if context.is_disconnect:
+                stats["disconnects"] += 1
+                print(f"[💀] Dead connection in '{name}' pool during a request:", repr(context.original_exception))
+
+    def untrack(self, name: str) -> None:
+        self._tracked.pop(name, None)
+        self.pool_stats.pop(name, None)
+
+    def tracked(self) -> Dict[str, AsyncEngine]:
+        return dict(self._tracked)
+
+    async def validate_idle(self, name: str, timeout: float) -> int:
+        """
+        Проверяет простаивающие соединения пула по одному: берёт из пула,
+        делает SELECT 1 и возвращает. Пул по умолчанию FIFO, поэтому за
+        checkedin() итераций каждое свободное соединение проверяется один раз;
+        соединения старше pool_recycle пересоздаются при этом же checkout.
+        Не ответившие закрываются. Возвращает число мёртвых соединений.
+        """
+        engine = self._tracked[name]
+        pool = engine.sync_engine.pool
+        stats = self.pool_stats[name]
+        dead = 0
+        for _ in range(pool.checkedin() if hasattr(pool, "checkedin") else 0):
+            # Свободные соединения разобрали запросы — новые ради проверки не открываем
+            if pool.checkedin() == 0:
+                break
+            conn = await engine.connect()
+            try:
+                await asyncio.wait_for(conn.exec_driver_sql("SELECT 1"), timeout=timeout)
+                stats["validated"] += 1
+            except (asyncio.TimeoutError, OSError, SQLAlchemyError) as e:
+                dead += 1
+                stats["dead"] += 1
+                print(f"[💀] Dead idle connection in '{name}' pool:", repr(e))
+                # При обрыве SQLAlchemy уже инвалидировал соединение (и старые в пуле)
+                if not (isinstance(e, DBAPIError) and e.connection_invalidated):
+                    await conn.invalidate()
+            finally:
+                await conn.close()
+        return dead
+
+    def pool_report(self) -> Dict[str, Dict[str, Any]]:
+        """Состояние по каждому пулу — для логов; имена пулов клиентов содержат client_id."""
+        report: Dict[str, Dict[str, Any]] = {}
+        for name, engine in self._tracked.items():
+            pool = engine.sync_engine.pool
+            report[name] = {
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                **self.pool_stats.get(name, {}),
+            }
+        return report
+
+    def pool_summary(self) -> Dict[str, int]:
+        """Суммы по всем пулам, без имён — можно отдавать в публичный /health."""
+        summary = {"pools": 0, "checked_in": 0, "checked_out": 0, "validated": 0, "dead": 0, "disconnects": 0}
+        for entry in self.pool_report().values():
+            summary["pools"] += 1
+            for key in ("checked_in", "checked_out", "validated", "dead", "disconnects"):
+                summary[key] += entry.get(key) or 0
+        return summary
+
+    def engine(self, name: str) -> AsyncEngine:
+        return self._engines[name]
+
+    def sessionmaker(self, name: str) -> sessionmaker:
+        return self._sessions[name]
+
+    def names(self):
+        return list(self._engines)
+
+    def replicas(self):
+        return list(self._replicas)
+
+    def replica_available(self, name: str) -> bool:
+        return name in self._replicas and self._replica_ok[name]
+
+    def mark_replica(self, name: str, ok: bool, reason: str = "") -> None:
+        if self._replica_ok.get(name) == ok:
+            return
+        self._replica_ok[name] = ok
+        if ok:
+            print(f"[📖] Replica of '{name}' is back, reads go to replica")
+        else:
+            print(f"[⚠️] Replica of '{name}' unavailable ({reason}), reads go to primary")
+
+    def replica_engine(self, name: str) -> AsyncEngine:
+        return self._engines[self._replicas[name]]
+
+    @asynccontextmanager
+    async def read_session(self, name: str) -> AsyncIterator[AsyncSession]:
+        """Сессия только для чтения (ReadSession): реплика или primary, соединение — при первом запросе."""
+        async with ReadSession(self, name) as session:
+            yield session
+
+    def read_sessionmaker(self, name: str) -> Callable[[], Any]:
+        """Фабрика read_session(name) — для run_sections, выгрузок и фоновых задач."""
+        return partial(self.read_session, name)
+
+    async def check_replica(self, name: str, lag_sql: str = "", max_lag: float = 0.0) -> Optional[float]:
+        """Проверяет реплику: жива ли и, при max_lag > 0, не отстала ли больше max_lag секунд."""
+        try:
+            async with self._sessions[self._replicas[name]]() as session:
+                lag = (await session.execute(text(lag_sql or DEFAULT_LAG_SQL))).scalar()
+        except REPLICA_ERRORS as e:
+            self.replica_lag[name] = None
+            self.mark_replica(name, False, repr(e))
+            return None
+        lag = float(lag or 0.0)
+        self.replica_lag[name] = lag
+        if max_lag > 0 and lag > max_lag:
+            self.mark_replica(name, False, f"lag {lag:.1f}s > {max_lag:.1f}s")
+        else:
+            self.mark_replica(name, True)
+        return lag
+
+    async def _warm(self, name: str, count: int) -> None:
+        # Держим count соединений одновременно, чтобы пул реально их создал,
+        # а не отдал одно и то же count раз
+        engine = self._engines[name]
+        conns = await asyncio.gather(*(engine.connect() for _ in range(count)))
+        try:
+            await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
+        finally:
+            await asyncio.gather(*(conn.close() for conn in conns))
+
+    async def warm_up(self) -> None:
+        """Открывает DB_POOL_WARMUP соединений в каждом пуле, которыми пользуются роуты."""
+        count = max(1, min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))
+        results = await asyncio.gather(
+            *(self._warm(name, count) for name in self._engines),
+            return_exceptions=True,
+        )
+        for name, result in zip(self._engines, results):
+            if isinstance(result, Exception):
+                print(f"[❌] Warm-up of '{name}' pool failed:", repr(result))
+            else:
+                print(f"[🔌] Warmed '{name}' pool: {count} connection(s)")
+
+    async def dispose(self) -> None:
+        await asyncio.gather(*(engine.dispose() for engine in self._engines.values()))
+
+
+class ReplicaMonitor:
+    """
+    Фоновая проверка реплик: недоступная или отставшая реплика
+    выключается из чтения, после восстановления — возвращается.
+    """
+
+    def __init__(self, registry: EngineRegistry, interval: float, max_lag: float, lag_sql: str = ""):
+        self.registry = registry
+        self.interval = interval
+        self.max_lag = max_lag
+        self.lag_sql = lag_sql
+        self._task: Optional[asyncio.Task] = None
+
+    async def check_once(self) -> Dict[str, Optional[float]]:
+        names = self.registry.replicas()
+        lags = await asyncio.gather(
+            *(self.registry.check_replica(name, self.lag_sql, self.max_lag) for name in names)
+        )
+        return dict(zip(names, lags))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[❌] Replica check failed:", repr(e))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None and self.registry.replicas():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class PoolHealthChecker:
+    """
+    Фоновая проверка пулов вместо pool_pre_ping: запрос не платит лишний
+    round trip на checkout, а мёртвые соединения находятся и закрываются
+    между запросами. Пулы проверяются параллельно, соединения в пуле — по одному.
+    """
+
+    def __init__(self, registry: EngineRegistry, interval: float, timeout: float):
+        self.registry = registry
+        self.interval = interval
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+
+    async def check_once(self) -> Dict[str, int]:
+        names = list(self.registry.tracked())
+        results = await asyncio.gather(
+            *(self.registry.validate_idle(name, self.timeout) for name in names),
+            return_exceptions=True,
+        )
+        dead: Dict[str, int] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, KeyError):
+                continue  # пул закрыли (например, вытеснили движок клиента) во время проверки
+            if isinstance(result, Exception):
+                print(f"[❌] Pool check of '{name}' failed:", repr(result))
+            else:
+                dead[name] = result
+        return dead
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[❌] Pool check failed:", repr(e))
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+engines = EngineRegistry()
+
+# 🔧 Основная БД (Liderix)
+engines.register("liderix", settings.LIDERIX_DB_URL, replica_url=settings.LIDERIX_REPLICA_DB_URL)
+
+# 🔹 Клиентская БД ITStep — с кэшем prepared statements asyncpg
+engines.register(
+    "itstep",
+    settings.ITSTEP_DB_URL,
+    replica_url=settings.ITSTEP_REPLICA_DB_URL,
+    connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+)
+
+pool_checker = PoolHealthChecker(
+    engines,
+    interval=settings.DB_POOL_CHECK_SECONDS,
+    timeout=settings.DB_POOL_CHECK_TIMEOUT,
+)
+
+replica_monitor = ReplicaMonitor(
+    engines,
+    interval=settings.REPLICA_CHECK_SECONDS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_sql=settings.REPLICA_LAG_SQL,
+)
@@ -1,11 +1,14 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
 
 # Конфигурация
 from liderix_api.config import settings
 
+# Подключения к БД — один пул на базу (engines.py)
+from liderix_api.engines import engines, pool_checker, replica_monitor
+from liderix_api.db import get_async_session
+from liderix_api.db_client_itstep import SessionItstep
+
 # Основные роутеры (из основной БД)
 from liderix_api.routes import (
     users as users_router,
@@ -24,49 +27,83 @@ from liderix_api.routes.analytics import sales as sales_router
 
 # ✅ Новый роут для инсайтов (APIRouter)
 from liderix_api.routes.insights.sales.route import router as insights_sales_router
+from liderix_api.routes.insights.stream.route import router as insights_stream_router
+from liderix_api.routes.insights.batch.route import router as insights_batch_router
+
+# Кэш витрин и отслеживание их обновлений
+from liderix_api.services.mv_cache import mv_cache, MVRefreshWatcher
+from liderix_api.services.insights_feed import insights_feed
+from liderix_api.services.forecast import nightly_forecast
+from liderix_api.services.anomalies import anomaly_scan
+from liderix_api.utils.etag import ETagMiddleware
+from liderix_api.tenants import TenantMiddleware, tenants
 
 # Создание приложения
 app = FastAPI()
 
+# --- 304 Not Modified для аналитики, пока витрины не обновились ---
+# (добавлен раньше CORS, чтобы 304 тоже получали CORS-заголовки)
+app.add_middleware(ETagMiddleware, prefixes=("/api/dashboard", "/api/analytics"))
+
+# --- Клиент запроса (JWT client_id / X-Client-Id) → current_client ---
+# (снаружи ETag: версия данных и ключи кэша берутся для этого клиента)
+app.add_middleware(TenantMiddleware)
+
 # --- CORS ---
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Уточни в проде
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Partial-Sections"],  # курсор keyset-пагинации, версия данных, упавшие секции
 )
 
-# --- Подключения к БД ---
 
-# Основная (Liderix)
-engine_liderix = create_async_engine(settings.LIDERIX_DB_URL, echo=False, pool_pre_ping=True)
-SessionLiderix = sessionmaker(engine_liderix, class_=AsyncSession, expire_on_commit=False)
-
-# Клиентская (ITStep)
-engine_itstep = create_async_engine(settings.ITSTEP_DB_URL, echo=False, pool_pre_ping=True)
-SessionItstep = sessionmaker(engine_itstep, class_=AsyncSession, expire_on_commit=False)
+# --- Отслеживание refresh витрин ITStep (сброс кэша) ---
+mv_refresh_watcher = MVRefreshWatcher(
+    mv_cache,
+    SessionItstep,
+    client=settings.ITSTEP_CLIENT_ID,
+    interval=settings.MV_REFRESH_POLL_SECONDS,
+    version_sql=settings.MV_REFRESH_VERSION_SQL,
+    # Читаем с реплики — сбрасываем кэш, когда она успела догнать refresh
+    settle=settings.REPLICA_MAX_LAG_SECONDS if settings.ITSTEP_REPLICA_DB_URL else 0.0,
+)
 
 # --- Прогрев соединений ---
 @app.on_event("startup")
 async def on_startup():
-    async with engine_liderix.begin() as conn:
-        await conn.run_sync(lambda conn: None)
-    async with engine_itstep.begin() as conn:
-        await conn.run_sync(lambda conn: None)
+    # Те же пулы, что используют роуты
+    await engines.warm_up()
+    replica_monitor.start()
+    pool_checker.start()
+    mv_refresh_watcher.start()
+    insights_feed.start()
+    tenants.start()
+    nightly_forecast.start()
+    anomaly_scan.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await mv_refresh_watcher.stop()
+    await nightly_forecast.stop()
+    await anomaly_scan.stop()
+    await insights_feed.stop()
+    await tenants.stop()
+    await replica_monitor.stop()
+    await pool_checker.stop()
+    await engines.dispose()
 
 # --- Зависимости для FastAPI DI ---
-async def get_liderix_session() -> AsyncSession:
-    async with SessionLiderix() as session:
-        yield session
-
-async def get_itstep_session() -> AsyncSession:
-    async with SessionItstep() as session:
-        yield session
+# Те же функции, что в роутах: FastAPI кэширует зависимость в пределах запроса,
+# поэтому зависимость уровня роутера не открывает вторую сессию
+get_liderix_session = get_async_session
 
 # --- Health-check ---
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    # Только суммы по пулам: имена пулов клиентов раскрыли бы их client_id
+    return {"status": "ok", "pools": engines.pool_summary()}
 
 # --- Подключение роутеров ---
 
@@ -81,11 +118,25 @@ app.include_router(auth_router.router, prefix="/api/auth", tags=["Auth"], depend
 app.include_router(analytics_router.router, prefix="/api/analytics", tags=["Analytics"], dependencies=[Depends(get_liderix_session)])
 
 # Клиентская БД
-app.include_router(dashboard_router.router, prefix="/api/dashboard", tags=["Dashboard"], dependencies=[Depends(get_itstep_session)])
+# Без зависимости уровня роутера: сессию берут только роуты, которым она нужна
+# (/summary открывает свои — по одной на панель)
+app.include_router(dashboard_router.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(analytics_router.router, prefix="/api/analytics", tags=["Analytics"])
 # ✅ Инсайты (прямое подключение APIRouter)
 app.include_router(
     insights_sales_router,
     prefix="/api/insights/sales",
     tags=["AI Insights"]
-)
\ No newline at end of file
+)
+# ✅ Push новых инсайтов (SSE)
+app.include_router(
+    insights_stream_router,
+    prefix="/api/insights/stream",
+    tags=["AI Insights"]
+)
+# ✅ Последние инсайты пачкой по клиентам и агентам
+app.include_router(
+    insights_batch_router,
+    prefix="/api/insights/batch",
+    tags=["AI Insights"]
+)
@@ -0,0 +1,4 @@
+from .registry import registry, to_model, to_models, AnalyticsQuery
+
+# Регистрация запросов при импорте пакета
+from . import dashboard, ads, sales, export, forecast, funnel, roas, anomalies, insights
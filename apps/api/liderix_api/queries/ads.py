@@ -0,0 +1,121 @@
+# apps/api/liderix_api/queries/ads.py
+
+from itertools import combinations
+from typing import Literal, Sequence, Tuple, get_args
+
+from liderix_api.schemas.ads import (
+    AdsDailyItem,
+    AdsCampaignItem,
+    AdsAdGroupItem,
+    AdsPlatformItem,
+    AdsUtmItem,
+)
+
+from .registry import registry
+
+# Диапазон полуоткрытый: dt >= :from_date AND dt < :to_date
+
+registry.register("ads.daily", """
+    SELECT dt AS date, spend, clicks, impressions, ctr, cpc, cpm
+    FROM dashboards.ads_campaigns_kpi_daily
+    WHERE dt >= :from_date AND dt < :to_date
+    ORDER BY dt
+""", ("from_date", "to_date"), AdsDailyItem)
+
+# --- Агрегаты по сущностям ---
+# Кампании / группы / площадки сворачиваются в SQL: одна строка на сущность
+# (и на день, если в group_by есть "date"). Отношения считаются взвешенно:
+#   CPC = Σspend / Σclicks, CPA = Σspend / Σconversions,
+#   CTR = Σclicks / Σimpressions — где показов нет, берём неявные clicks / ctr.
+# Так единицы CTR (доля или %) остаются теми же, что в витрине. День с кликами,
+# но ctr = 0/NULL, показов не восстанавливает: он не входит ни в числитель, ни в
+# знаменатель CTR и считается в ctr_missing_days. Суммы — bigint (большие аккаунты).
+
+AdsGroupBy = Literal["entity", "date"]
+DEFAULT_GROUP_BY: Tuple[str, ...] = ("entity",)
+
+_DATE_DIM = ("dt AS date", "dt")
+
+_SECTIONS = {
+    "campaigns": dict(
+        source="dashboards.ads_campaigns_daily",
+        entity=("campaign_id, MAX(campaign_key) AS campaign_name", "campaign_id"),
+        metrics="""
+        SUM(spend)::float8 AS spend,
+        SUM(clicks)::bigint AS clicks,
+        SUM(conversions)::bigint AS conversions,
+        COALESCE((SUM(clicks) FILTER (WHERE ctr > 0))::float8
+                 / NULLIF(SUM(clicks::float8 / NULLIF(ctr, 0)) FILTER (WHERE ctr > 0), 0), 0) AS ctr,
+        (COUNT(*) FILTER (WHERE COALESCE(ctr, 0) = 0 AND clicks > 0))::int AS ctr_missing_days,
+        COALESCE(SUM(spend)::float8 / NULLIF(SUM(clicks), 0), 0) AS cpc,
+        COALESCE(SUM(spend)::float8 / NULLIF(SUM(conversions), 0), 0) AS cpa""",
+        schema=AdsCampaignItem,
+    ),
+    "adgroups": dict(
+        source="dashboards.google_ads_adgroup_daily",
+        entity=("ad_group_id, MAX(ad_group_name) AS ad_group_name", "ad_group_id"),
+        metrics="""
+        SUM(spend)::float8 AS spend,
+        SUM(clicks)::bigint AS clicks,
+        SUM(conversions)::bigint AS conversions,
+        COALESCE((SUM(clicks) FILTER (WHERE ctr > 0))::float8
+                 / NULLIF(SUM(clicks::float8 / NULLIF(ctr, 0)) FILTER (WHERE ctr > 0), 0), 0) AS ctr,
+        (COUNT(*) FILTER (WHERE COALESCE(ctr, 0) = 0 AND clicks > 0))::int AS ctr_missing_days,
+        COALESCE(SUM(spend)::float8 / NULLIF(SUM(clicks), 0), 0) AS cpc,
+        COALESCE(SUM(spend)::float8 / NULLIF(SUM(conversions), 0), 0) AS cpa""",
+        schema=AdsAdGroupItem,
+    ),
+    # В ads_platform_daily нет конверсий — отдаём 0 и пустой CPA
+    "platforms": dict(
+        source="dashboards.ads_platform_daily",
+        entity=("platform", "platform"),
+        metrics="""
+        SUM(spend)::float8 AS spend,
+        SUM(impressions)::bigint AS impressions,
+        SUM(clicks)::bigint AS clicks,
+        0 AS conversions,
+        COALESCE(SUM(ctr * impressions)::float8 / NULLIF(SUM(impressions), 0), 0) AS ctr,
+        COALESCE(SUM(spend)::float8 / NULLIF(SUM(clicks), 0), 0) AS cpc,
+        NULL::float8 AS cpa""",
+        schema=AdsPlatformItem,
+    ),
+}
+
+
+def _query_name(section: str, group_by: Tuple[str, ...]) -> str:
+    if group_by == DEFAULT_GROUP_BY:
+        return f"ads.{section}"
+    return f"ads.{section}.by_" + "_".join(group_by)
+
+
+def grouped_query(section: str, group_by: Sequence[str] = DEFAULT_GROUP_BY) -> str:
+    """
+    Имя зарегистрированного запроса для секции и набора измерений.
+    Порядок измерений не важен; неизвестное измерение → ValueError.
+    """
+    dims = tuple(d for d in get_args(AdsGroupBy) if d in set(group_by))
+    if not dims or len(dims) != len(set(group_by)):
+        raise ValueError(f"group_by must be a non-empty subset of {list(get_args(AdsGroupBy))}")
+    return _query_name(section, dims)
+
+
+for _section, _spec in _SECTIONS.items():
+    for _n in range(1, len(get_args(AdsGroupBy)) + 1):
+        for _dims in combinations(get_args(AdsGroupBy), _n):
+            _parts = [_spec["entity"] if d == "entity" else _DATE_DIM for d in _dims]
+            _select = ", ".join(p[0] for p in _parts)
+            _group = ", ".join(p[1] for p in _parts)
+            _order = "dt, spend DESC" if "date" in _dims else "spend DESC"
+            registry.register(_query_name(_section, _dims), f"""
+    SELECT {_select},{_spec["metrics"]}
+    FROM {_spec["source"]}
+    WHERE dt >= :from_date AND dt < :to_date
+    GROUP BY {_group}
+    ORDER BY {_order}
+""", ("from_date", "to_date"), _spec["schema"])
+
+registry.register("ads.utm", """
+    SELECT date, utm_source, utm_medium, utm_campaign, sessions, conversions, spend, conv_rate, cpa, cps
+    FROM dashboards.ads_by_utm_daily
+    WHERE date >= :from_date AND date < :to_date
+""", ("from_date", "to_date"), AdsUtmItem)
@@ -0,0 +1,38 @@
+# apps/api/liderix_api/queries/anomalies.py
+
+from .registry import registry
+
+# 🚨 Все дневные ряды для детектора на одном сплошном календаре.
+# Дня нет в витрине → NULL (NaN в детекторе), а не 0: иначе ещё не загруженный
+# вчерашний день выглядел бы провалом всех рядов, а CTR/CPC без рекламы — нулём.
+registry.register("anomalies.daily", """
+    SELECT
+        d::date AS date,
+        a.spend::float8       AS spend,
+        a.ctr::float8         AS ctr,
+        a.cpc::float8         AS cpc,
+        a.ads_revenue::float8 AS ads_revenue,
+        s.revenue::float8     AS revenue,
+        s.contracts::float8   AS contracts,
+        t.sessions::float8    AS sessions
+    FROM generate_series(CAST(:from_date AS date), CAST(:to_date AS date), interval '1 day') AS d
+    LEFT JOIN (
+        SELECT date, SUM(cost) AS spend, AVG(ctr) AS ctr, AVG(cpc) AS cpc, SUM(revenue) AS ads_revenue
+        FROM analytics.mv_ads_overview_daily
+        WHERE date BETWEEN :from_date AND :to_date
+        GROUP BY date
+    ) a ON a.date = d::date
+    LEFT JOIN (
+        SELECT date, SUM(total_revenue) AS revenue, SUM(contract_count) AS contracts
+        FROM dashboards.mv_crm_sales_daily
+        WHERE date BETWEEN :from_date AND :to_date
+        GROUP BY date
+    ) s ON s.date = d::date
+    LEFT JOIN (
+        SELECT date, SUM(total_sessions) AS sessions
+        FROM analytics.mv_channel_traffic_daily
+        WHERE date BETWEEN :from_date AND :to_date
+        GROUP BY date
+    ) t ON t.date = d::date
+    ORDER BY d
+""", ("from_date", "to_date"))
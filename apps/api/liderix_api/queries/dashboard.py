@@ -0,0 +1,208 @@
+# apps/api/liderix_api/queries/dashboard.py
+
+from liderix_api.schemas.dashboard import (
+    ChannelStats,
+    CreativeStats,
+    DeviceStats,
+    CrmStats,
+    Insight,
+    KpiMetrics,
+    LineChartPoint,
+    UtmPerformance,
+)
+
+from .registry import registry
+
+# Варианты ".after" — следующая страница keyset-пагинации (seek-предикат по ключу сортировки).
+# NULL в ключе → '' (COALESCE и в ORDER BY, и в seek): иначе сравнение кортежей
+# с NULL даёт NULL и строки теряются. Ключ курсора в overview.py строится так же.
+
+CHANNELS_SQL = """
+    SELECT
+      date,
+      channel_name,
+      utm_source   AS source,
+      utm_medium   AS medium,
+      COALESCE(total_sessions, 0)    AS sessions,
+      COALESCE(total_new_users, 0)   AS users,
+      COALESCE(avg_bounce_rate, 0.0) AS bounce_rate
+    FROM analytics.mv_channel_traffic_daily
+    WHERE date BETWEEN :from_date AND :to_date
+    {seek}
+    ORDER BY date DESC,
+             COALESCE(channel_name, '') DESC,
+             COALESCE(utm_source, '') DESC,
+             COALESCE(utm_medium, '') DESC
+    LIMIT :limit
+"""
+CHANNELS_SEEK = """
+      AND (date, COALESCE(channel_name, ''), COALESCE(utm_source, ''), COALESCE(utm_medium, ''))
+        < (:after_date, :after_channel, :after_source, :after_medium)
+"""
+registry.register("dashboard.channels", CHANNELS_SQL.format(seek=""),
+                  ("from_date", "to_date", "limit"), ChannelStats)
+registry.register("dashboard.channels.after", CHANNELS_SQL.format(seek=CHANNELS_SEEK),
+                  ("from_date", "to_date", "limit", "after_date", "after_channel", "after_source", "after_medium"),
+                  ChannelStats)
+
+CREATIVES_SQL = """
+    SELECT
+      date,
+      creative_id      AS creative,
+      COALESCE(impressions, 0) AS impressions,
+      COALESCE(clicks, 0)      AS clicks,
+      COALESCE(ctr, 0.0)::float8 AS ctr
+    FROM analytics.mv_creative_performance
+    WHERE date BETWEEN :from_date AND :to_date
+    {seek}
+    ORDER BY COALESCE(ctr, 0.0)::float8 DESC, date DESC, COALESCE(creative_id::text, '') DESC
+    LIMIT :limit
+"""
+CREATIVES_SEEK = """
+      AND (COALESCE(ctr, 0.0)::float8, date, COALESCE(creative_id::text, ''))
+        < (:after_ctr, :after_date, :after_creative)
+"""
+registry.register("dashboard.creatives", CREATIVES_SQL.format(seek=""),
+                  ("from_date", "to_date", "limit"), CreativeStats)
+registry.register("dashboard.creatives.after", CREATIVES_SQL.format(seek=CREATIVES_SEEK),
+                  ("from_date", "to_date", "limit", "after_ctr", "after_date", "after_creative"),
+                  CreativeStats)
+
+DEVICES_SQL = """
+    SELECT
+      date,
+      device_type,
+      COALESCE(total_sessions, 0)    AS sessions,
+      COALESCE(total_new_users, 0)   AS users,
+      COALESCE(avg_bounce_rate, 0.0) AS bounce_rate
+    FROM analytics.mv_device_usage_daily
+    WHERE date BETWEEN :from_date AND :to_date
+    {seek}
+    ORDER BY date DESC, COALESCE(device_type, '') DESC
+    LIMIT :limit
+"""
+DEVICES_SEEK = "AND (date, COALESCE(device_type, '')) < (:after_date, :after_device)"
+registry.register("dashboard.devices", DEVICES_SQL.format(seek=""),
+                  ("from_date", "to_date", "limit"), DeviceStats)
+registry.register("dashboard.devices.after", DEVICES_SQL.format(seek=DEVICES_SEEK),
+                  ("from_date", "to_date", "limit", "after_date", "after_device"), DeviceStats)
+
+CRM_SQL = """
+    SELECT
+      date,
+      source_key                       AS source,
+      COALESCE(total_contracts, 0)::int AS deals_started,
+      0                                 AS deals_closed,  -- нет данных
+      COALESCE(total_revenue, 0)::numeric AS revenue
+    FROM analytics.mv_crm_by_source_daily
+    WHERE date BETWEEN :from_date AND :to_date
+    {seek}
+    ORDER BY date DESC, COALESCE(source_key::text, '') DESC
+    LIMIT :limit
+"""
+CRM_SEEK = "AND (date, COALESCE(source_key::text, '')) < (:after_date, :after_source)"
+registry.register("dashboard.crm", CRM_SQL.format(seek=""),
+                  ("from_date", "to_date", "limit"), CrmStats)
+registry.register("dashboard.crm.after", CRM_SQL.format(seek=CRM_SEEK),
+                  ("from_date", "to_date", "limit", "after_date", "after_source"), CrmStats)
+
+registry.register("dashboard.insights", """
+    SELECT
+      summary,
+      insights,
+      recommendations,
+      agent_name,
+      insight_date
+    FROM ai.agent_insights
+    ORDER BY created_at DESC
+    LIMIT :limit
+""", ("limit",), Insight)
+
+# Обе последние строки MV одним запросом — один round trip вместо двух
+registry.register("dashboard.kpi", """
+    SELECT
+      COALESCE(rev.total_revenue, 0)::numeric      AS revenue,
+      COALESCE(rev.contracts_count, 0)::int        AS contracts_count,
+      COALESCE(rev.avg_contract_value, 0.0)::numeric AS avg_check,
+      COALESCE(ads.ctr, 0.0)  AS ctr,
+      COALESCE(ads.cpc, 0.0)  AS cpc,
+      COALESCE(ads.roas,0.0)  AS roas
+    FROM (
+      SELECT total_revenue, contracts_count, avg_contract_value
+      FROM analytics.mv_daily_revenue
+      ORDER BY date DESC
+      LIMIT 1
+    ) rev
+    CROSS JOIN (
+      SELECT ctr, cpc, roas
+      FROM analytics.mv_ads_overview_daily
+      ORDER BY date DESC
+      LIMIT 1
+    ) ads
+""", (), KpiMetrics)
+
+# Текущий и предыдущий периоды — один проход по каждой MV (FILTER), один round trip.
+# CTR/CPC в mv_ads_overview_daily уже дневные отношения — берём среднее;
+# ROAS периода считается из сумм выручки и расходов.
+registry.register("dashboard.kpi.compare", """
+    WITH rev AS (
+      SELECT
+        COALESCE(SUM(total_revenue)   FILTER (WHERE date BETWEEN :cur_from  AND :cur_to),  0)::float8 AS cur_revenue,
+        COALESCE(SUM(total_revenue)   FILTER (WHERE date BETWEEN :prev_from AND :prev_to), 0)::float8 AS prev_revenue,
+        COALESCE(SUM(contracts_count) FILTER (WHERE date BETWEEN :cur_from  AND :cur_to),  0)::int    AS cur_contracts,
+        COALESCE(SUM(contracts_count) FILTER (WHERE date BETWEEN :prev_from AND :prev_to), 0)::int    AS prev_contracts
+      FROM analytics.mv_daily_revenue
+      WHERE date BETWEEN :prev_from AND :cur_to
+    ),
+    ads AS (
+      SELECT
+        COALESCE(AVG(ctr)     FILTER (WHERE date BETWEEN :cur_from  AND :cur_to),  0)::float8 AS cur_ctr,
+        COALESCE(AVG(ctr)     FILTER (WHERE date BETWEEN :prev_from AND :prev_to), 0)::float8 AS prev_ctr,
+        COALESCE(AVG(cpc)     FILTER (WHERE date BETWEEN :cur_from  AND :cur_to),  0)::float8 AS cur_cpc,
+        COALESCE(AVG(cpc)     FILTER (WHERE date BETWEEN :prev_from AND :prev_to), 0)::float8 AS prev_cpc,
+        COALESCE(SUM(cost)    FILTER (WHERE date BETWEEN :cur_from  AND :cur_to),  0)::float8 AS cur_cost,
+        COALESCE(SUM(cost)    FILTER (WHERE date BETWEEN :prev_from AND :prev_to), 0)::float8 AS prev_cost,
+        COALESCE(SUM(revenue) FILTER (WHERE date BETWEEN :cur_from  AND :cur_to),  0)::float8 AS cur_ads_revenue,
+        COALESCE(SUM(revenue) FILTER (WHERE date BETWEEN :prev_from AND :prev_to), 0)::float8 AS prev_ads_revenue
+      FROM analytics.mv_ads_overview_daily
+      WHERE date BETWEEN :prev_from AND :cur_to
+    )
+    SELECT * FROM rev CROSS JOIN ads
+""", ("cur_from", "cur_to", "prev_from", "prev_to"))
+
+registry.register("dashboard.linechart.day", """
+    SELECT
+      date,
+      cost    AS spend,
+      revenue AS revenue_sum,
+      roas
+    FROM analytics.mv_ads_overview_daily
+    WHERE (:from_date IS NULL OR date >= :from_date)
+      AND   (:to_date   IS NULL OR date <= :to_date)
+    ORDER BY date ASC
+""", ("from_date", "to_date"), LineChartPoint)
+
+# Свёртка в SQL: ROAS периода = выручка / расходы, а не среднее дневных ROAS
+for granularity in ("week", "month"):
+    registry.register(f"dashboard.linechart.{granularity}", f"""
+        SELECT
+          date_trunc('{granularity}', date)::date  AS date,
+          COALESCE(SUM(cost), 0)                   AS spend,
+          COALESCE(SUM(revenue), 0)                AS revenue_sum,
+          COALESCE(SUM(revenue) / NULLIF(SUM(cost), 0), 0) AS roas
+        FROM analytics.mv_ads_overview_daily
+        WHERE (:from_date IS NULL OR date >= :from_date)
+          AND   (:to_date   IS NULL OR date <= :to_date)
+        GROUP BY 1
+        ORDER BY 1 ASC
+    """, ("from_date", "to_date"), LineChartPoint)
+
+registry.register("dashboard.utm", """
+    SELECT
+      utm_campaign,
+      COALESCE(total_conversions, 0)::int   AS total_conversions,
+      COALESCE(total_revenue,     0.0)::numeric AS total_revenue
+    FROM analytics.mv_utm_performance
+    ORDER BY total_conversions DESC
+    LIMIT :limit
+""", ("limit",), UtmPerformance)
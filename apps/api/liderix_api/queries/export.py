@@ -0,0 +1,28 @@
+# apps/api/liderix_api/queries/export.py
+
+from .registry import registry
+
+# 📤 Выгрузки для финансов — без LIMIT, читаются серверным курсором.
+# Границы дат необязательны: NULL → без ограничения с этой стороны.
+
+registry.register("export.ads_utm_daily", """
+    SELECT date, utm_source, utm_medium, utm_campaign, sessions, conversions, spend, conv_rate, cpa, cps
+    FROM dashboards.ads_by_utm_daily
+    WHERE (CAST(:from_date AS date) IS NULL OR date >= :from_date)
+      AND (CAST(:to_date AS date) IS NULL OR date <= :to_date)
+    ORDER BY date
+""", ("from_date", "to_date"))
+
+registry.register("export.sales_daily", """
+    SELECT date, contract_count, total_revenue, total_first_sum
+    FROM dashboards.mv_crm_sales_daily
+    WHERE (CAST(:from_date AS date) IS NULL OR date >= :from_date)
+      AND (CAST(:to_date AS date) IS NULL OR date <= :to_date)
+    ORDER BY date
+""", ("from_date", "to_date"))
+
+registry.register("export.sales_by_utm", """
+    SELECT utm_source, utm_medium, utm_campaign, contract_count, total_revenue, total_first_sum
+    FROM dashboards.mv_crm_sales_by_utm
+    ORDER BY total_revenue DESC
+""", ())
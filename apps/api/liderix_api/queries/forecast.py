@@ -0,0 +1,27 @@
+# apps/api/liderix_api/queries/forecast.py
+
+from .registry import registry
+
+# Сплошной календарь: пропущенные дни → 0, чтобы ряды были выровнены
+registry.register("forecast.daily", """
+    SELECT
+        d::date AS date,
+        COALESCE(r.revenue, 0)::float8     AS revenue,
+        COALESCE(r.contracts, 0)::float8   AS contracts,
+        COALESCE(a.spend, 0)::float8       AS spend,
+        COALESCE(a.ads_revenue, 0)::float8 AS ads_revenue
+    FROM generate_series(CAST(:from_date AS date), CAST(:to_date AS date), interval '1 day') AS d
+    LEFT JOIN (
+        SELECT date, SUM(total_revenue) AS revenue, SUM(contracts_count) AS contracts
+        FROM analytics.mv_daily_revenue
+        WHERE date BETWEEN :from_date AND :to_date
+        GROUP BY date
+    ) r ON r.date = d::date
+    LEFT JOIN (
+        SELECT date, SUM(cost) AS spend, SUM(revenue) AS ads_revenue
+        FROM analytics.mv_ads_overview_daily
+        WHERE date BETWEEN :from_date AND :to_date
+        GROUP BY date
+    ) a ON a.date = d::date
+    ORDER BY d
+""", ("from_date", "to_date"))
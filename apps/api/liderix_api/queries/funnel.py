@@ -0,0 +1,62 @@
+# apps/api/liderix_api/queries/funnel.py
+
+from .registry import registry
+
+# 🧩 Воронка: сессии (GA) → лиды (конверсии по UTM) → договоры (CRM), за период
+registry.register("funnel.totals", """
+    SELECT
+      (SELECT COALESCE(SUM(total_sessions), 0)::bigint
+         FROM analytics.mv_channel_traffic_daily
+        WHERE date BETWEEN :from_date AND :to_date) AS sessions,
+      (SELECT COALESCE(SUM(conversions), 0)::bigint
+         FROM dashboards.ads_by_utm_daily
+        WHERE date BETWEEN :from_date AND :to_date) AS leads,
+      (SELECT COALESCE(SUM(contract_count), 0)::bigint
+         FROM dashboards.mv_crm_sales_daily
+        WHERE date BETWEEN :from_date AND :to_date) AS contracts
+""", ("from_date", "to_date"))
+
+# 📈 Когорты удержания по неделям.
+# Источник — dashboards.mv_crm_client_activity_weekly (client_sk, week_start):
+# одна строка на клиента и неделю, в которой у него был договор/оплата.
+# Когорта клиента — неделя первой активности.
+
+# Полная матрица до недели :until включительно, смещения 0..:max_offset
+registry.register("cohorts.full", """
+    WITH first AS (
+      SELECT client_sk, MIN(week_start) AS cohort_week
+      FROM dashboards.mv_crm_client_activity_weekly
+      GROUP BY client_sk
+    )
+    SELECT
+      f.cohort_week,
+      ((a.week_start - f.cohort_week) / 7)::int AS week_offset,
+      COUNT(DISTINCT a.client_sk)::int         AS clients
+    FROM dashboards.mv_crm_client_activity_weekly a
+    JOIN first f USING (client_sk)
+    WHERE a.week_start <= :until
+      AND a.week_start - f.cohort_week <= 7 * :max_offset
+    GROUP BY f.cohort_week, week_offset
+""", ("until", "max_offset"))
+
+# Одна новая неделя: только клиенты, активные в :week, → одна диагональ матрицы
+registry.register("cohorts.week", """
+    WITH active AS (
+      SELECT DISTINCT client_sk
+      FROM dashboards.mv_crm_client_activity_weekly
+      WHERE week_start = :week
+    ),
+    first AS (
+      SELECT v.client_sk, MIN(v.week_start) AS cohort_week
+      FROM dashboards.mv_crm_client_activity_weekly v
+      JOIN active USING (client_sk)
+      GROUP BY v.client_sk
+    )
+    SELECT
+      cohort_week,
+      ((CAST(:week AS date) - cohort_week) / 7)::int AS week_offset,
+      COUNT(*)::int                                  AS clients
+    FROM first
+    WHERE cohort_week >= CAST(:week AS date) - 7 * :max_offset
+    GROUP BY cohort_week
+""", ("week", "max_offset"))
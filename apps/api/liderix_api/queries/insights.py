@@ -0,0 +1,57 @@
+# apps/api/liderix_api/queries/insights.py
+
+from .registry import registry
+
+# 🔎 Дешёвая проверка: id последнего инсайта агента (по индексу, без JSONB)
+registry.register("insights.latest_id", """
+    SELECT id
+    FROM ai.agent_insights
+    WHERE client_id = :client_id AND agent_name = :agent_name
+    ORDER BY created_at DESC
+    LIMIT 1
+""", ("client_id", "agent_name"))
+
+registry.register("insights.by_id", """
+    SELECT summary, insights::jsonb AS insights, recommendations::jsonb AS recommendations
+    FROM ai.agent_insights
+    WHERE id = :id
+""", ("id",))
+
+# 📡 Лента новых инсайтов для SSE: одна выборка на процесс за интервал опроса
+registry.register("insights.feed.head", """
+    SELECT COALESCE(MAX(created_at), now()) AS created_at
+    FROM ai.agent_insights
+""")
+
+registry.register("insights.feed.since", """
+    SELECT
+      id,
+      client_id::text AS client_id,
+      agent_name,
+      insight_date,
+      created_at,
+      summary,
+      insights::jsonb        AS insights,
+      recommendations::jsonb AS recommendations
+    FROM ai.agent_insights
+    WHERE created_at > :since
+    ORDER BY created_at
+""", ("since",))
+
+# 📦 Последний инсайт на каждую пару (client, agent) одним запросом.
+# Опирается на индекс (client_id, agent_name, created_at DESC) — см. sql/itstep/.
+registry.register("insights.latest_batch", """
+    SELECT DISTINCT ON (client_id, agent_name)
+      id,
+      client_id::text AS client_id,
+      agent_name,
+      insight_date,
+      created_at,
+      summary,
+      insights::jsonb        AS insights,
+      recommendations::jsonb AS recommendations
+    FROM ai.agent_insights
+    WHERE client_id = ANY(:client_ids)
+      AND agent_name = ANY(:agent_names)
+    ORDER BY client_id, agent_name, created_at DESC
+""", ("client_ids", "agent_names"))
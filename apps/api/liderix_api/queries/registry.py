@@ -0,0 +1,96 @@
+# apps/api/liderix_api/queries/registry.py
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Result, Row, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+
+@dataclass(frozen=True)
+class AnalyticsQuery:
+    """
+    Один аналитический запрос: SQL, ожидаемые параметры и схема строки.
+    text() собирается один раз при объявлении — SQLAlchemy переиспользует
+    скомпилированную форму, а asyncpg — prepared statement на соединении.
+    """
+    name: str
+    sql: str
+    params: Tuple[str, ...] = ()
+    schema: Optional[Type[BaseModel]] = None
+    statement: TextClause = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "statement", text(self.sql))
+
+
+class QueryRegistry:
+    def __init__(self):
+        self._queries: Dict[str, AnalyticsQuery] = {}
+
+    def register(
+        self,
+        name: str,
+        sql: str,
+        params: Sequence[str] = (),
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> AnalyticsQuery:
+        if name in self._queries:
+            raise ValueError(f"Query '{name}' is already registered")
+        query = AnalyticsQuery(name, sql, tuple(params), schema)
+        self._queries[name] = query
+        return query
+
+    def __getitem__(self, name: str) -> AnalyticsQuery:
+        return self._queries[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    async def execute(self, session: AsyncSession, name: str, **params: Any) -> Result:
+        query = self._queries[name]
+        if set(params) != set(query.params):
+            raise ValueError(
+                f"Query '{name}' expects params {sorted(query.params)}, got {sorted(params)}"
+            )
+        return await session.execute(query.statement, params)
+
+    async def rows(self, session: AsyncSession, name: str, **params: Any) -> Sequence[Row]:
+        result = await self.execute(session, name, **params)
+        return result.fetchall()
+
+    async def one(self, session: AsyncSession, name: str, **params: Any) -> Optional[Row]:
+        result = await self.execute(session, name, **params)
+        return result.fetchone()
+
+    async def models(self, session: AsyncSession, name: str, **params: Any) -> List[BaseModel]:
+        query = self._queries[name]
+        return to_models(query.schema, await self.rows(session, name, **params))
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def to_models(schema: Type[BaseModel], rows: Sequence[Row]) -> List[BaseModel]:
+    """
+    Строки витрин → модели одним вызовом валидатора на весь список
+    (TypeAdapter схемы кэшируется). Валидация нужна: response_model не
+    перепроверяет готовые модели, а asyncpg отдаёт ::numeric как Decimal —
+    без приведения к float такие поля ушли бы в JSON строками.
+    """
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return _list_adapter(schema).validate_python([dict(zip(keys, row)) for row in rows])
+
+
+def to_model(schema: Type[BaseModel], row: Row) -> BaseModel:
+    return schema.model_validate(dict(row._mapping))
+
+
+registry = QueryRegistry()
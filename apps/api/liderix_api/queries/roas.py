@@ -0,0 +1,107 @@
+# apps/api/liderix_api/queries/roas.py
+
+from liderix_api.schemas.analytics import CampaignROASItem, CustomerMetricsItem
+
+from .registry import registry
+
+# 💰 Расходы кампаний ↔ выручка CRM одним запросом.
+# Ключ соединения — имя кампании (campaign_key) = utm_campaign, без учёта регистра.
+# Обе стороны сворачиваются до ключа × период до JOIN: кампании с одним именем
+# (например, на двух платформах) — одна строка, иначе выручка CRM засчиталась бы
+# каждой из них. campaign_id такой строки — id кампаний через запятую.
+# mv_crm_sales_by_utm_daily — sql/itstep/crm_daily_views.sql.
+
+ROAS_PERIODS = {
+    "total": "NULL::date",
+    "week": "date_trunc('week', {col})::date",
+    "month": "date_trunc('month', {col})::date",
+}
+
+for _period, _expr in ROAS_PERIODS.items():
+    registry.register(f"roas.campaigns.{_period}", f"""
+    WITH spend AS (
+      SELECT
+        {_expr.format(col="dt")}      AS period_start,
+        lower(campaign_key)           AS join_key,
+        string_agg(DISTINCT campaign_id::text, ',') AS campaign_id,
+        MAX(campaign_key)             AS campaign_name,
+        SUM(spend)::float8            AS spend
+      FROM dashboards.ads_campaigns_daily
+      WHERE dt BETWEEN :from_date AND :to_date
+      GROUP BY 1, 2
+    ),
+    crm AS (
+      SELECT
+        {_expr.format(col="date")}    AS period_start,
+        lower(utm_campaign)           AS join_key,
+        SUM(total_revenue)::float8    AS revenue,
+        SUM(contract_count)::int      AS contracts
+      FROM dashboards.mv_crm_sales_by_utm_daily
+      WHERE date BETWEEN :from_date AND :to_date
+      GROUP BY 1, 2
+    )
+    SELECT
+      s.period_start,
+      s.campaign_id                                       AS campaign_id,
+      COALESCE(s.campaign_name, '')                       AS campaign_name,
+      s.spend,
+      COALESCE(c.revenue, 0)                              AS revenue,
+      COALESCE(c.contracts, 0)                            AS contracts,
+      COALESCE(COALESCE(c.revenue, 0) / NULLIF(s.spend, 0), 0) AS roas,
+      s.spend / NULLIF(c.contracts, 0)                    AS cac
+    FROM spend s
+    LEFT JOIN crm c
+      ON c.join_key = s.join_key
+     AND c.period_start IS NOT DISTINCT FROM s.period_start
+    ORDER BY s.period_start NULLS FIRST, s.spend DESC
+""", ("from_date", "to_date"), CampaignROASItem)
+
+# 👤 Клиенты по неделям: новые / вернувшиеся — из dashboards.mv_crm_client_activity_weekly
+# (см. когорты; DDL — sql/itstep/crm_daily_views.sql), средний чек — из mv_crm_sales_daily,
+# CLV — накопленная выручка на накопленное число клиентов. Окна считаются по всей истории, фильтр — снаружи.
+registry.register("roas.customers", """
+    WITH first AS (
+      SELECT client_sk, MIN(week_start) AS cohort_week
+      FROM dashboards.mv_crm_client_activity_weekly
+      GROUP BY client_sk
+    ),
+    activity AS (
+      SELECT
+        a.week_start,
+        COUNT(*) FILTER (WHERE a.week_start = f.cohort_week)::int AS new_customers,
+        COUNT(*) FILTER (WHERE a.week_start > f.cohort_week)::int AS returning_customers
+      FROM dashboards.mv_crm_client_activity_weekly a
+      JOIN first f USING (client_sk)
+      GROUP BY a.week_start
+    ),
+    sales AS (
+      SELECT
+        date_trunc('week', date)::date AS week_start,
+        SUM(total_revenue)::float8     AS revenue,
+        SUM(contract_count)::int       AS contracts
+      FROM dashboards.mv_crm_sales_daily
+      GROUP BY 1
+    ),
+    joined AS (
+      SELECT
+        a.week_start,
+        a.new_customers,
+        a.returning_customers,
+        COALESCE(s.revenue, 0)   AS revenue,
+        COALESCE(s.contracts, 0) AS contracts,
+        SUM(COALESCE(s.revenue, 0)) OVER w AS cum_revenue,
+        SUM(a.new_customers) OVER w        AS cum_customers
+      FROM activity a
+      LEFT JOIN sales s USING (week_start)
+      WINDOW w AS (ORDER BY a.week_start)
+    )
+    SELECT
+      week_start AS report_date,
+      new_customers,
+      returning_customers,
+      COALESCE(revenue / NULLIF(contracts, 0), 0)::float8          AS avg_check,
+      COALESCE(cum_revenue / NULLIF(cum_customers, 0), 0)::float8  AS clv
+    FROM joined
+    WHERE week_start BETWEEN :from_date AND :to_date
+    ORDER BY week_start
+""", ("from_date", "to_date"), CustomerMetricsItem)
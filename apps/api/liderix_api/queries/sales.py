@@ -0,0 +1,63 @@
+# apps/api/liderix_api/queries/sales.py
+
+from liderix_api.schemas.sales import (
+    SalesDailyItem,
+    SalesByServiceItem,
+    SalesByBranchItem,
+    SalesByUtmItem,
+)
+
+from .registry import registry
+
+registry.register("sales.daily", """
+    SELECT date, contract_count, total_revenue, total_first_sum
+    FROM dashboards.mv_crm_sales_daily
+    WHERE date BETWEEN :from_date AND :to_date
+    ORDER BY date
+""", ("from_date", "to_date"), SalesDailyItem)
+
+# --- Разрезы продаж ---
+# Основной путь — посуточные агрегаты (день × измерение), свёрнутые за период,
+# Top-N по выручке. Если посуточных витрин у клиента нет — сервис падает
+# обратно на витрины за всю историю (тоже с Top-N).
+
+_BREAKDOWNS = {
+    "by_service": ("service_id", "MAX(service_name) AS service_name", "mv_crm_sales_by_service", SalesByServiceItem),
+    "by_branch": ("branch_sk", "MAX(branch_name) AS branch_name", "mv_crm_sales_by_branch", SalesByBranchItem),
+    "by_utm": ("utm_source, utm_medium, utm_campaign", None, "mv_crm_sales_by_utm", SalesByUtmItem),
+}
+
+for _name, (_keys, _label, _view, _schema) in _BREAKDOWNS.items():
+    _select = f"{_keys}, {_label}" if _label else _keys
+    registry.register(f"sales.{_name}.range", f"""
+    SELECT {_select},
+           SUM(contract_count)::int AS contract_count,
+           SUM(total_revenue)::float8 AS total_revenue,
+           SUM(total_first_sum)::float8 AS total_first_sum
+    FROM dashboards.{_view}_daily
+    WHERE date BETWEEN :from_date AND :to_date
+    GROUP BY {_keys}
+    ORDER BY total_revenue DESC NULLS LAST
+    LIMIT :limit
+""", ("from_date", "to_date", "limit"), _schema)
+
+registry.register("sales.by_service", """
+    SELECT service_id, service_name, contract_count, total_revenue, total_first_sum
+    FROM dashboards.mv_crm_sales_by_service
+    ORDER BY total_revenue DESC NULLS LAST
+    LIMIT :limit
+""", ("limit",), SalesByServiceItem)
+
+registry.register("sales.by_branch", """
+    SELECT branch_sk, branch_name, contract_count, total_revenue, total_first_sum
+    FROM dashboards.mv_crm_sales_by_branch
+    ORDER BY total_revenue DESC NULLS LAST
+    LIMIT :limit
+""", ("limit",), SalesByBranchItem)
+
+registry.register("sales.by_utm", """
+    SELECT utm_source, utm_medium, utm_campaign, contract_count, total_revenue, total_first_sum
+    FROM dashboards.mv_crm_sales_by_utm
+    ORDER BY total_revenue DESC NULLS LAST
+    LIMIT :limit
+""", ("limit",), SalesByUtmItem)
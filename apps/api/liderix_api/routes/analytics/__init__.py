@@ -1,7 +1,12 @@
 from fastapi import APIRouter
-from . import sales, ads
+from . import sales, ads, export, forecast, funnel, roas, anomalies
 
 router = APIRouter()
 
 router.include_router(sales.router, prefix="/sales", tags=["Sales Analytics"])
-router.include_router(ads.router, prefix="/ads", tags=["Ads Analytics"])
\ No newline at end of file
+router.include_router(ads.router, prefix="/ads", tags=["Ads Analytics"])
+router.include_router(export.router, prefix="/export", tags=["Analytics Export"])
+router.include_router(forecast.router, prefix="/forecast", tags=["Analytics Forecast"])
+router.include_router(funnel.router, tags=["Analytics Funnel"])
+router.include_router(roas.router, tags=["Analytics ROAS"])
+router.include_router(anomalies.router, prefix="/anomalies", tags=["Analytics Anomalies"])
@@ -1,17 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from fastapi import APIRouter, HTTPException, Query, Response
 from datetime import datetime, timedelta, date
-from liderix_api.db_client_itstep import get_client_session_by_client_id
+from typing import List
+from liderix_api.config import settings
+from liderix_api.tenants import tenant_read_sessionmaker
+from liderix_api.queries import registry
+from liderix_api.queries.ads import AdsGroupBy, DEFAULT_GROUP_BY, grouped_query
+from liderix_api.services.day_cache import DAY_DATASETS, day_cache
+from liderix_api.utils.etag import mark_partial
+from liderix_api.utils.columnar import ResponseFormat, columnar_response, rows_payload, section_payload
+from liderix_api.utils.parallel import run_sections
 
 router = APIRouter()
-get_session = get_client_session_by_client_id("abc2ac2e-d352-453f-85f9-b7d078549fa3")
+
+# 📊 Секции ответа → зарегистрированные запросы (None — агрегат по group_by)
+ADS_SECTIONS = {
+    "daily": "ads.daily",
+    "campaigns": None,
+    "adGroups": None,
+    "platforms": None,
+    "utm": "ads.utm",
+}
+_GROUPED = {"campaigns": "campaigns", "adGroups": "adgroups", "platforms": "platforms"}
+
+
+def _section_job(query: str, params: dict, format: ResponseFormat):
+    async def _job(session):
+        if query in DAY_DATASETS:
+            # 🗓 Посуточные секции собираются из кэша, в БД — только недостающие дни
+            keys, rows = await day_cache.fetch(
+                session, query, params["from_date"], params["to_date"] - timedelta(days=1),
+            )
+            return rows_payload(keys, rows, format)
+        result = await registry.execute(session, query, **params)
+        return section_payload(result, format)
+    return _job
+
 
 @router.get("")
 async def get_ads_analytics(
-    session: AsyncSession = Depends(get_session),
+    response: Response,
     from_: str = None,
-    to: str = None
+    to: str = None,
+    format: ResponseFormat = "rows",
+    group_by: List[AdsGroupBy] = Query(
+        list(DEFAULT_GROUP_BY),
+        description="Измерения для campaigns/adGroups/platforms: entity — по сущности, date — по дням",
+    ),
+    timeout: float = Query(settings.ADS_SECTION_TIMEOUT, gt=0, le=60, description="Таймаут на секцию, сек"),
 ):
     try:
         today = date.today()
@@ -20,62 +55,33 @@ async def get_ads_analytics(
         from_date = datetime.strptime(from_, "%Y-%m-%d").date() if from_ else yesterday - timedelta(days=6)
         parsed_to = datetime.strptime(to, "%Y-%m-%d").date() if to else yesterday
         to_date = min(parsed_to, yesterday) + timedelta(days=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Дата должна быть в формате YYYY-MM-DD")
 
-        print(f"[🔍] Date range: {from_date} → {to_date} (excluding upper bound)")
-
-        result = {}
-
-        # 1. 📊 Daily KPI
-        daily = await session.execute(text("""
-            SELECT dt AS date, spend, clicks, impressions, ctr, cpc, cpm
-            FROM dashboards.ads_campaigns_kpi_daily
-            WHERE dt >= :from AND dt < :to
-            ORDER BY dt
-        """), {"from": from_date, "to": to_date})
-        result["daily"] = [dict(row._mapping) for row in daily.fetchall()]
-
-        # 2. 🎯 Campaigns
-        campaigns = await session.execute(text("""
-            SELECT campaign_id, campaign_key AS campaign_name, spend, clicks, conversions, ctr, cpc, cpa
-            FROM dashboards.ads_campaigns_daily
-            WHERE dt >= :from AND dt < :to
-        """), {"from": from_date, "to": to_date})
-        result["campaigns"] = [dict(row._mapping) for row in campaigns.fetchall()]
+    print(f"[🔍] Date range: {from_date} → {to_date} (excluding upper bound)")
 
-        # 3. 🧩 Ad Groups
-        adgroups = await session.execute(text("""
-            SELECT ad_group_id, ad_group_name, spend, clicks, conversions, ctr, cpc, cpa
-            FROM dashboards.google_ads_adgroup_daily
-            WHERE dt >= :from AND dt < :to
-        """), {"from": from_date, "to": to_date})
-        result["adGroups"] = [dict(row._mapping) for row in adgroups.fetchall()]
+    params = {"from_date": from_date, "to_date": to_date}
+    queries = {
+        name: query or grouped_query(_GROUPED[name], group_by)
+        for name, query in ADS_SECTIONS.items()
+    }
 
-        # 4. 🛰 Platforms
-        platforms = await session.execute(text("""
-            SELECT
-                platform,
-                spend,
-                impressions,
-                clicks,
-                0 AS conversions,
-                ctr,
-                cpc,
-                NULL AS cpa
-            FROM dashboards.ads_platform_daily
-            WHERE dt >= :from AND dt < :to
-        """), {"from": from_date, "to": to_date})
-        result["platforms"] = [dict(row._mapping) for row in platforms.fetchall()]
+    # ⚡ Секции идут параллельно, каждая на своём соединении из пула
+    jobs = {name: _section_job(query, params, format) for name, query in queries.items()}
+    results, errors = await run_sections(jobs, tenant_read_sessionmaker(), timeout)
 
-        # 5. 🔗 UTM Breakdown
-        utm = await session.execute(text("""
-            SELECT date, utm_source, utm_medium, utm_campaign, sessions, conversions, spend, conv_rate, cpa, cps
-            FROM dashboards.ads_by_utm_daily
-            WHERE date >= :from AND date < :to
-        """), {"from": from_date, "to": to_date})
-        result["utm"] = [dict(row._mapping) for row in utm.fetchall()]
+    if not results:
+        print("[❌] Error in get_ads_analytics: all sections failed", errors)
+        raise HTTPException(status_code=500, detail="Ошибка при получении аналитики")
 
-        return result
+    # Упавшая секция → null, причина в errors
+    result = {name: results.get(name) for name in ADS_SECTIONS}
+    result["errors"] = errors
 
-    except Exception as e:
-        print("[❌] Error in get_ads_analytics:", str(e))
-        raise HTTPException(status_code=500, detail="Ошибка при получении аналитики")
\ No newline at end of file
+    if format == "columnar":
+        # Готовый Response: заголовки параметра response к нему не переносятся
+        columnar = columnar_response(result)
+        mark_partial(columnar, errors)
+        return columnar
+    mark_partial(response, errors)
+    return result
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+
+from liderix_api.config import settings
+from liderix_api.schemas.analytics import AnomalyItem
+from liderix_api.services.anomalies import Method, get_anomalies
+from liderix_api.services.mv_cache import current_client
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[AnomalyItem], summary="Аномальные дни в расходах, CTR, выручке и трафике")
+async def get_anomalies_route(
+    days: int = Query(30, ge=1, le=settings.ANOMALY_SCAN_DAYS, description="За сколько последних дней искать аномалии"),
+    method: Method = Query("seasonal", description="zscore / mad — скользящее окно, seasonal — с учётом дня недели"),
+    threshold: float = Query(3.5, ge=settings.ANOMALY_MIN_SCORE, le=20, description="Порог |score| в σ"),
+):
+    # Последний полный день; детекторы считает фоновый пакет (AnomalyScan)
+    to_date = date.today() - timedelta(days=1)
+    items = get_anomalies(current_client.get(), to_date, days, method, threshold)
+    if items is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Anomaly scan is in progress",
+            headers={"Retry-After": str(int(settings.ANOMALY_SCAN_SECONDS))},
+        )
+    return items
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from liderix_api.config import settings
+from liderix_api.tenants import tenant_read_sessionmaker
+from liderix_api.queries import registry
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "ndjson"]
+
+# 📤 Датасет → (запрос, фильтруется ли по датам)
+EXPORT_DATASETS = {
+    "ads_by_utm_daily": ("export.ads_utm_daily", True),
+    "mv_crm_sales_daily": ("export.sales_daily", True),
+    "mv_crm_sales_by_utm": ("export.sales_by_utm", False),
+}
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Unsupported type: {type(value)}")
+
+
+def _csv_chunk(rows) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+def _ndjson_chunk(keys, rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(keys, row)), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def _stream_rows(session_factory, query: str, params: dict, format: ExportFormat) -> AsyncIterator[str]:
+    # 🔌 Сессия открывается внутри генератора: зависимости FastAPI
+    # закрываются до начала отдачи тела, а курсор живёт до конца выгрузки
+    chunk = settings.EXPORT_CHUNK_ROWS
+    try:
+        async with session_factory() as session:
+            result = await session.stream(
+                registry[query].statement, params,
+                execution_options={"yield_per": chunk},
+            )
+            keys = list(result.keys())
+            if format == "csv":
+                yield _csv_chunk([keys])
+            async for rows in result.partitions(chunk):
+                yield _csv_chunk(rows) if format == "csv" else _ndjson_chunk(keys, rows)
+    except Exception as e:
+        # Заголовки уже отправлены — статус не поменять, обрываем поток
+        print(f"[❌] Export '{query}' failed:", repr(e))
+        raise
+
+
+@router.get("/{dataset}", summary="Потоковая выгрузка датасета в CSV / NDJSON")
+async def export_dataset(
+    dataset: str,
+    format: ExportFormat = "csv",
+    from_date: Optional[date] = Query(None, description="Дата начала, YYYY-MM-DD"),
+    to_date: Optional[date] = Query(None, description="Дата окончания, YYYY-MM-DD"),
+):
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(404, f"Unknown dataset, expected one of {list(EXPORT_DATASETS)}")
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(400, "from_date must not be after to_date")
+
+    query, dated = EXPORT_DATASETS[dataset]
+    params = {"from_date": from_date, "to_date": to_date} if dated else {}
+
+    filename = f"{dataset}.{format}"
+    return StreamingResponse(
+        _stream_rows(tenant_read_sessionmaker(), query, params, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
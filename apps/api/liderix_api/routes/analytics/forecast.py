@@ -0,0 +1,19 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.db_client_itstep import get_client_read_session
+from liderix_api.schemas.analytics import ForecastItem
+from liderix_api.services.forecast import get_forecast
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[ForecastItem], summary="Прогноз выручки, договоров, расходов и ROAS")
+async def get_forecast_route(
+    horizon: int = Query(14, ge=1, le=90, description="Горизонт прогноза, дней"),
+    history: int = Query(180, ge=28, le=730, description="Глубина истории для обучения, дней"),
+    session: AsyncSession = Depends(get_client_read_session),
+):
+    return await get_forecast(session, horizon, history)
@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.db_client_itstep import get_client_read_session
+from liderix_api.schemas.analytics import FunnelStep, RetentionCohort
+from liderix_api.services.funnel import get_funnel, get_retention
+
+router = APIRouter()
+
+
+@router.get("/funnel", response_model=List[FunnelStep], summary="Воронка: сессии → лиды → договоры")
+async def get_funnel_route(
+    from_date: Optional[date] = Query(None, description="Дата начала, YYYY-MM-DD (по умолчанию — 30 дней назад)"),
+    to_date: Optional[date] = Query(None, description="Дата окончания, YYYY-MM-DD (по умолчанию — вчера)"),
+    session: AsyncSession = Depends(get_client_read_session),
+):
+    to_date = to_date or date.today() - timedelta(days=1)
+    from_date = from_date or to_date - timedelta(days=29)
+    if from_date > to_date:
+        raise HTTPException(400, "from_date must not be after to_date")
+    return await get_funnel(session, from_date, to_date)
+
+
+@router.get("/retention", response_model=List[RetentionCohort], summary="Недельные когорты удержания")
+async def get_retention_route(
+    weeks: int = Query(12, ge=1, le=260, description="Сколько последних когорт вернуть"),
+    rebuild: bool = Query(False, description="Пересобрать матрицу целиком"),
+    session: AsyncSession = Depends(get_client_read_session),
+):
+    return await get_retention(session, weeks, rebuild)
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.db_client_itstep import get_client_read_session
+from liderix_api.schemas.analytics import CampaignROASItem, CustomerMetricsItem
+from liderix_api.services.roas import RoasPeriod, get_campaign_roas, get_customer_metrics
+
+router = APIRouter()
+
+
+def _period(from_date: Optional[date], to_date: Optional[date], days: int) -> Tuple[date, date]:
+    to_date = to_date or date.today() - timedelta(days=1)
+    from_date = from_date or to_date - timedelta(days=days - 1)
+    if from_date > to_date:
+        raise HTTPException(400, "from_date must not be after to_date")
+    return from_date, to_date
+
+
+@router.get("/campaign-roas", response_model=List[CampaignROASItem], summary="ROAS и CAC по кампаниям")
+async def get_campaign_roas_route(
+    from_date: Optional[date] = Query(None, description="Дата начала, YYYY-MM-DD (по умолчанию — 30 дней назад)"),
+    to_date: Optional[date] = Query(None, description="Дата окончания, YYYY-MM-DD (по умолчанию — вчера)"),
+    period: RoasPeriod = Query("total", description="total — за весь диапазон, week / month — по периодам"),
+    session: AsyncSession = Depends(get_client_read_session),
+):
+    return await get_campaign_roas(session, *_period(from_date, to_date, 30), period)
+
+
+@router.get("/customers", response_model=List[CustomerMetricsItem], summary="Новые / вернувшиеся клиенты, средний чек, CLV")
+async def get_customer_metrics_route(
+    from_date: Optional[date] = Query(None, description="Дата начала, YYYY-MM-DD (по умолчанию — 12 недель назад)"),
+    to_date: Optional[date] = Query(None, description="Дата окончания, YYYY-MM-DD (по умолчанию — вчера)"),
+    session: AsyncSession = Depends(get_client_read_session),
+):
+    return await get_customer_metrics(session, *_period(from_date, to_date, 84))
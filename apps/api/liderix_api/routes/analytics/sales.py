@@ -1,61 +1,65 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 from datetime import datetime, date, timedelta
 from typing import Optional
 
-from liderix_api.db_client_itstep import get_client_async_session
+from liderix_api.db_client_itstep import get_client_read_session
+from liderix_api.services.day_cache import day_cache
+from liderix_api.services.sales import build_sales_series
+from liderix_api.services.sales_breakdown import breakdown_scope, fetch_breakdown
+from liderix_api.utils.columnar import ResponseFormat, columnar_response, columns_payload, rows_payload
 
 router = APIRouter()
 
+
+def _rows(rows, format: ResponseFormat):
+    return rows_payload(list(rows[0]._fields) if rows else [], rows, format)
+
+
 @router.get("/")
 async def get_sales_analytics(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    session: AsyncSession = Depends(get_client_async_session),
+    format: ResponseFormat = Query("rows", description="rows — массив объектов, columnar — массивы по колонкам"),
+    limit: int = Query(20, ge=1, le=500, description="Top-N для byService / byBranch / byUtm"),
+    ma_window: int = Query(7, ge=1, le=365, description="Окно скользящего среднего выручки, дней"),
+    session: AsyncSession = Depends(get_client_read_session),
 ):
     today = date.today()
     default_from = today - timedelta(days=6)
     default_to = today
 
     params = {
-        "from": from_date.date() if from_date else default_from,
-        "to": to_date.date() if to_date else default_to,
+        "from_date": from_date.date() if from_date else default_from,
+        "to_date": to_date.date() if to_date else default_to,
     }
 
-    daily = await session.execute(text("""
-        SELECT date, contract_count, total_revenue, total_first_sum
-        FROM dashboards.mv_crm_sales_daily
-        WHERE date BETWEEN :from AND :to
-        ORDER BY date
-    """), params)
-
-    weekly = await session.execute(text("""
-        SELECT week_start, total_revenue
-        FROM dashboards.mv_crm_sales_by_week
-        WHERE week_start BETWEEN :from AND :to
-        ORDER BY week_start
-    """), params)
-
-    by_service = await session.execute(text("""
-        SELECT service_id, service_name, contract_count, total_revenue, total_first_sum
-        FROM dashboards.mv_crm_sales_by_service
-    """))
-
-    by_branch = await session.execute(text("""
-        SELECT branch_sk, branch_name, contract_count, total_revenue, total_first_sum
-        FROM dashboards.mv_crm_sales_by_branch
-    """))
-
-    by_utm = await session.execute(text("""
-        SELECT utm_source, utm_medium, utm_campaign, contract_count, total_revenue, total_first_sum
-        FROM dashboards.mv_crm_sales_by_utm
-    """))
-
-    return {
-        "daily": [dict(row._mapping) for row in daily.fetchall()],
-        "weekly": [dict(row._mapping) for row in weekly.fetchall()],
-        "byService": [dict(row._mapping) for row in by_service.fetchall()],
-        "byBranch": [dict(row._mapping) for row in by_branch.fetchall()],
-        "byUtm": [dict(row._mapping) for row in by_utm.fetchall()],
-    }
\ No newline at end of file
+    # 🗓 По дням — из посуточного кэша, в БД только недостающие дни
+    last_day = min(params["to_date"], today)
+    daily_keys, daily_rows = await day_cache.fetch(session, "sales.daily", params["from_date"], last_day)
+    # 📅 Недели / месяцы / кварталы / тренд — свёртки того же ряда в памяти
+    series = build_sales_series(daily_rows, params["from_date"], last_day, ma_window)
+    # 🧾🏢🌐 Разрезы — Top-N за тот же период
+    by_service = await fetch_breakdown(session, "by_service", params["from_date"], params["to_date"], limit)
+    by_branch = await fetch_breakdown(session, "by_branch", params["from_date"], params["to_date"], limit)
+    by_utm = await fetch_breakdown(session, "by_utm", params["from_date"], params["to_date"], limit)
+
+    result = {
+        "daily": rows_payload(daily_keys, daily_rows, format),
+        "weekly": columns_payload(series["weekly"], format),
+        "monthly": columns_payload(series["monthly"], format),
+        "quarterly": columns_payload(series["quarterly"], format),
+        "trend": columns_payload(series["trend"], format),
+        "byService": _rows(by_service, format),
+        "byBranch": _rows(by_branch, format),
+        "byUtm": _rows(by_utm, format),
+        # "all_time" — посуточной витрины нет, разрез не учитывает период
+        "breakdownScope": {
+            "byService": breakdown_scope("by_service"),
+            "byBranch": breakdown_scope("by_branch"),
+            "byUtm": breakdown_scope("by_utm"),
+        },
+    }
+    if format == "columnar":
+        return columnar_response(result)
+    return result
@@ -18,5 +18,9 @@ async def login(data: LoginRequest, session: AsyncSession = Depends(get_async_se
     if not user or not verify_password(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token({"sub": str(user.id)})
+    claims = {"sub": str(user.id)}
+    if user.client_id:
+        # По client_id из токена tenants.py выбирает БД клиента
+        claims["client_id"] = str(user.client_id)
+    token = create_access_token(claims)
     return TokenResponse(access_token=token)
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from uuid import UUID
 from datetime import datetime
 
-from liderix_api.db import get_async_session
+from liderix_api.db import get_async_session, get_read_session
 from liderix_api.schemas.client import ClientRead, ClientCreate, ClientUpdate
 from liderix_api.models.client import Client
 from liderix_api.models.users import User
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/clients", tags=["Clients"])
 # 🔹 Получить всех клиентов текущего пользователя
 @router.get("/", response_model=list[ClientRead])
 async def get_clients(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     result = await session.execute(
@@ -27,7 +27,7 @@ async def get_clients(
 @router.get("/{client_id}", response_model=ClientRead)
 async def get_client(
     client_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     client = await session.get(Client, client_id)
@@ -1,14 +1,35 @@
 # apps/api/liderix_api/routes/dashboard/overview.py
 
 from datetime import date
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+import numpy as np
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from asyncpg import InsufficientPrivilegeError
+from sqlalchemy import Row
 
-from ...db_client_itstep import get_client_session_by_client_id
+from ...config import settings
+from ...db_client_itstep import get_client_read_session
+from ...tenants import tenant_read_sessionmaker
+from ...utils.parallel import run_sections
+from ...utils.cursor import decode_cursor, paginate
+from ...utils.downsample import lttb_indices
+from ...utils.etag import mark_partial
+from ...utils.columnar import ResponseFormat, columnar_response, to_columns
+from ...queries import to_model, to_models
+from ...services.dashboard import (
+    Granularity,
+    fetch_channels,
+    fetch_creatives,
+    fetch_devices,
+    fetch_crm,
+    fetch_insights,
+    fetch_kpi,
+    fetch_linechart,
+    fetch_utm,
+    get_kpi_comparison,
+)
 from ...schemas.dashboard import (
     ChannelStats,
     CreativeStats,
@@ -16,8 +37,10 @@ from ...schemas.dashboard import (
     CrmStats,
     Insight,
     KpiMetrics,
+    KpiComparison,
     LineChartPoint,
     UtmPerformance,
+    DashboardSummary,
 )
 
 router = APIRouter(
@@ -26,220 +49,227 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-get_itstep_session = get_client_session_by_client_id(
-    "abc2ac2e-d352-453f-85f9-b7d078549fa3"
-)
+# БД клиента запроса (client_id из JWT / X-Client-Id, по умолчанию ITStep);
+# дашборд только читает — реплика, при её недоступности primary
+get_client_session = get_client_read_session
+
+
+# SQL панелей объявлен в queries/dashboard.py, выборки с кэшем — в services/dashboard.py.
+
+# Списочные панели листаются keyset-курсором: ключ сортировки последней строки
+# страницы превращается в seek-предикат "(date, key) < (:after...)", поэтому
+# глубокие страницы стоят столько же, сколько первая.
+
+CHANNELS_KEY = (date.fromisoformat, str, str, str)
+CREATIVES_KEY = (float, date.fromisoformat, str)
+DEVICES_KEY = (date.fromisoformat, str)
+CRM_KEY = (date.fromisoformat, str)
+
+
+def _channels_key(r: Row) -> list:
+    return [r.date, r.channel_name or "", r.source or "", r.medium or ""]
+
+
+# Те же COALESCE(..., '') / ::text, что в ORDER BY и seek-предикатах queries/dashboard.py
+def _text_key(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _creatives_key(r: Row) -> list:
+    return [float(r.ctr), r.date, _text_key(r.creative)]
+
+
+def _devices_key(r: Row) -> list:
+    return [r.date, _text_key(r.device_type)]
+
+
+def _crm_key(r: Row) -> list:
+    return [r.date, _text_key(r.source)]
+
+
+# --- Эндпоинты ---
+
+def _decode_after(cursor: Optional[str], key_types) -> Optional[list]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, key_types)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
 
 @router.get("/channels", response_model=List[ChannelStats], summary="Трафик по каналам за период")
 async def get_channels(
+    response: Response,
     from_date: date = Query(..., description="Дата начала, YYYY-MM-DD"),
     to_date: date   = Query(..., description="Дата окончания, YYYY-MM-DD"),
     limit:   int    = Query(100, ge=1, le=1000),
-    session: AsyncSession = Depends(get_itstep_session),
+    cursor:  Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    format:  ResponseFormat = Query("rows", description="rows — массив объектов, columnar — массивы по колонкам"),
+    session: AsyncSession = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          date,
-          channel_name,
-          utm_source   AS source,
-          utm_medium   AS medium,
-          COALESCE(total_sessions, 0)    AS sessions,
-          COALESCE(total_new_users, 0)   AS users,
-          COALESCE(avg_bounce_rate, 0.0) AS bounce_rate
-        FROM analytics.mv_channel_traffic_daily
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY date DESC
-        LIMIT :limit
-    """
-    res = await session.execute(text(sql), {
-        "from_date": from_date,
-        "to_date":   to_date,
-        "limit":     limit,
-    })
-    return [ChannelStats(**r._mapping) for r in res.fetchall()]
+    after = _decode_after(cursor, CHANNELS_KEY)
+    rows = await fetch_channels(session, from_date, to_date, limit + 1, after)
+    page, next_cursor = paginate(rows, limit, _channels_key)
+    if format == "columnar":
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return columnar_response(to_columns(page, list(ChannelStats.model_fields)), headers)
+    _set_next_cursor(response, next_cursor)
+    return to_models(ChannelStats, page)
 
 
 @router.get("/creatives", response_model=List[CreativeStats], summary="Показатели по креативам за период")
 async def get_creatives(
+    response: Response,
     from_date: date = Query(..., description="Дата начала, YYYY-MM-DD"),
     to_date: date   = Query(..., description="Дата окончания, YYYY-MM-DD"),
     limit:   int    = Query(100, ge=1, le=1000),
-    session: AsyncSession = Depends(get_itstep_session),
+    cursor:  Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    session: AsyncSession = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          date,
-          creative_id      AS creative,
-          COALESCE(impressions, 0) AS impressions,
-          COALESCE(clicks, 0)      AS clicks,
-          COALESCE(ctr, 0.0)       AS ctr
-        FROM analytics.mv_creative_performance
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY ctr DESC
-        LIMIT :limit
-    """
-    res = await session.execute(text(sql), {
-        "from_date": from_date,
-        "to_date":   to_date,
-        "limit":     limit,
-    })
-    return [CreativeStats(**r._mapping) for r in res.fetchall()]
+    after = _decode_after(cursor, CREATIVES_KEY)
+    rows = await fetch_creatives(session, from_date, to_date, limit + 1, after)
+    page, next_cursor = paginate(rows, limit, _creatives_key)
+    _set_next_cursor(response, next_cursor)
+    return to_models(CreativeStats, page)
 
 
 @router.get("/devices", response_model=List[DeviceStats], summary="Использование устройств за период")
 async def get_devices(
+    response: Response,
     from_date: date = Query(..., description="Дата начала, YYYY-MM-DD"),
     to_date: date   = Query(..., description="Дата окончания, YYYY-MM-DD"),
     limit:   int    = Query(100, ge=1, le=1000),
-    session: AsyncSession = Depends(get_itstep_session),
+    cursor:  Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    session: AsyncSession = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          date,
-          device_type,
-          COALESCE(total_sessions, 0)    AS sessions,
-          COALESCE(total_new_users, 0)   AS users,
-          COALESCE(avg_bounce_rate, 0.0) AS bounce_rate
-        FROM analytics.mv_device_usage_daily
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY date DESC
-        LIMIT :limit
-    """
-    res = await session.execute(text(sql), {
-        "from_date": from_date,
-        "to_date":   to_date,
-        "limit":     limit,
-    })
-    return [DeviceStats(**r._mapping) for r in res.fetchall()]
+    after = _decode_after(cursor, DEVICES_KEY)
+    rows = await fetch_devices(session, from_date, to_date, limit + 1, after)
+    page, next_cursor = paginate(rows, limit, _devices_key)
+    _set_next_cursor(response, next_cursor)
+    return to_models(DeviceStats, page)
 
 
 @router.get("/crm", response_model=List[CrmStats], summary="CRM-показатели по источникам за период")
 async def get_crm(
+    response: Response,
     from_date: date = Query(..., description="Дата начала, YYYY-MM-DD"),
     to_date: date   = Query(..., description="Дата окончания, YYYY-MM-DD"),
     limit:   int    = Query(100, ge=1, le=1000),
-    session: AsyncSession = Depends(get_itstep_session),
+    cursor:  Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    session: AsyncSession = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          date,
-          source_key                       AS source,
-          COALESCE(total_contracts, 0)::int AS deals_started,
-          0                                 AS deals_closed,  -- нет данных
-          COALESCE(total_revenue, 0)::numeric AS revenue
-        FROM analytics.mv_crm_by_source_daily
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY date DESC
-        LIMIT :limit
-    """
-    res = await session.execute(text(sql), {
-        "from_date": from_date,
-        "to_date":   to_date,
-        "limit":     limit,
-    })
-    return [CrmStats(**r._mapping) for r in res.fetchall()]
+    after = _decode_after(cursor, CRM_KEY)
+    rows = await fetch_crm(session, from_date, to_date, limit + 1, after)
+    page, next_cursor = paginate(rows, limit, _crm_key)
+    _set_next_cursor(response, next_cursor)
+    return to_models(CrmStats, page)
 
 
 @router.get("/insights", response_model=List[Insight], summary="Последние AI-инсайты")
 async def get_insights(
     limit: int = Query(5, ge=1, le=50),
-    session: AsyncSession = Depends(get_itstep_session),
+    session: AsyncSession = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          summary,
-          insights,
-          recommendations,
-          agent_name,
-          insight_date
-        FROM ai.agent_insights
-        ORDER BY created_at DESC
-        LIMIT :limit
-    """
-    try:
-        res = await session.execute(text(sql), {"limit": limit})
-    except InsufficientPrivilegeError:
-        # если нет прав на схему ai — просто вернём пустой список
-        return []
-    return [Insight(**r._mapping) for r in res.fetchall()]
+    rows = await fetch_insights(session, limit)
+    return to_models(Insight, rows)
 
 
 @router.get("/kpi", response_model=KpiMetrics, summary="Сводные KPI-метрики (финансы + реклама)")
-async def get_kpi(session: AsyncSession = Depends(get_itstep_session)):
-    rev_sql = """
-        SELECT
-          COALESCE(total_revenue, 0)::numeric AS total_revenue,
-          COALESCE(contracts_count, 0)::int  AS contracts_count,
-          COALESCE(avg_contract_value, 0.0)::numeric AS avg_contract_value
-        FROM analytics.mv_daily_revenue
-        ORDER BY date DESC
-        LIMIT 1
-    """
-    ads_sql = """
-        SELECT
-          COALESCE(ctr, 0.0)  AS ctr,
-          COALESCE(cpc, 0.0)  AS cpc,
-          COALESCE(roas,0.0)  AS roas
-        FROM analytics.mv_ads_overview_daily
-        ORDER BY date DESC
-        LIMIT 1
-    """
-    rev_res = await session.execute(text(rev_sql))
-    ads_res = await session.execute(text(ads_sql))
-
-    rev = rev_res.fetchone()
-    ads = ads_res.fetchone()
-    if not rev or not ads:
+async def get_kpi(session: AsyncSession = Depends(get_client_session)):
+    row = await fetch_kpi(session)
+    if not row:
         raise HTTPException(404, "KPI data not found")
+    return to_model(KpiMetrics, row)
 
-    return KpiMetrics(
-        revenue=rev._mapping["total_revenue"],
-        contracts_count=rev._mapping["contracts_count"],
-        avg_check=rev._mapping["avg_contract_value"],
-        ctr=ads._mapping["ctr"],
-        cpc=ads._mapping["cpc"],
-        roas=ads._mapping["roas"],
-    )
+
+@router.get("/kpi/compare", response_model=KpiComparison, summary="KPI за период против предыдущего периода")
+async def get_kpi_compare(
+    from_date: date = Query(..., description="Дата начала, YYYY-MM-DD"),
+    to_date: date   = Query(..., description="Дата окончания, YYYY-MM-DD"),
+    session: AsyncSession = Depends(get_client_session),
+):
+    if from_date > to_date:
+        raise HTTPException(400, "from_date must not be after to_date")
+    return await get_kpi_comparison(session, from_date, to_date)
 
 
 @router.get("/linechart", response_model=List[LineChartPoint], summary="ROAS по дням (линейный график)")
 async def get_linechart(
     from_date: Optional[date] = Query(None, description="С фильтром от"),
     to_date:   Optional[date] = Query(None, description="С фильтром до"),
-    session: AsyncSession    = Depends(get_itstep_session),
+    granularity: Granularity  = Query("day", description="Шаг точек: day / week / month"),
+    max_points: Optional[int] = Query(None, ge=3, le=5000, description="Прорядить до N точек (LTTB)"),
+    downsample_by: Literal["roas", "revenue_sum", "spend"] = Query("roas", description="Ряд, форму которого сохраняет LTTB"),
+    session: AsyncSession    = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          date,
-          cost    AS spend,
-          revenue AS revenue_sum,
-          roas
-        FROM analytics.mv_ads_overview_daily
-        WHERE (:from_date IS NULL OR date >= :from_date)
-          AND   (:to_date   IS NULL OR date <= :to_date)
-        ORDER BY date ASC
-    """
-    res = await session.execute(text(sql), {
-        "from_date": from_date,
-        "to_date":   to_date,
-    })
-    return [LineChartPoint(**r._mapping) for r in res.fetchall()]
+    rows = await fetch_linechart(session, from_date, to_date, granularity)
+    if max_points is not None and len(rows) > max_points:
+        x = np.fromiter((r.date.toordinal() for r in rows), dtype=np.float64, count=len(rows))
+        y = np.fromiter((float(getattr(r, downsample_by) or 0) for r in rows), dtype=np.float64, count=len(rows))
+        rows = [rows[i] for i in lttb_indices(x, y, max_points)]
+    return to_models(LineChartPoint, rows)
 
 
 @router.get("/utm", response_model=List[UtmPerformance], summary="UTM-связки и их эффективность")
 async def get_utm_performance(
     limit: int = Query(100, ge=1, le=1000),
-    session: AsyncSession = Depends(get_itstep_session),
+    session: AsyncSession = Depends(get_client_session),
 ):
-    sql = """
-        SELECT
-          utm_campaign,
-          COALESCE(total_conversions, 0)::int   AS total_conversions,
-          COALESCE(total_revenue,     0.0)::numeric AS total_revenue
-        FROM analytics.mv_utm_performance
-        ORDER BY total_conversions DESC
-        LIMIT :limit
+    rows = await fetch_utm(session, limit)
+    return to_models(UtmPerformance, rows)
+
+
+@router.get("/summary", response_model=DashboardSummary, summary="Все панели дашборда одним запросом")
+async def get_summary(
+    response: Response,
+    from_date: date = Query(..., description="Дата начала, YYYY-MM-DD"),
+    to_date: date   = Query(..., description="Дата окончания, YYYY-MM-DD"),
+    limit:   int    = Query(100, ge=1, le=1000),
+    insights_limit: int = Query(5, ge=1, le=50),
+    timeout: float  = Query(settings.DASHBOARD_PANEL_TIMEOUT, gt=0, le=60, description="Таймаут на панель, сек"),
+):
+    """
+    Все панели запрашиваются параллельно, каждая на своём соединении из пула ITStep.
+    Время ответа ≈ самая медленная панель; упавшие панели отдаются как null
+    с маркером в `errors`, такой ответ не кэшируется (без ETag).
     """
-    res = await session.execute(text(sql), {"limit": limit})
-    return [UtmPerformance(**r._mapping) for r in res.fetchall()]
\ No newline at end of file
+    jobs = {
+        "channels":  lambda s: fetch_channels(s, from_date, to_date, limit),
+        "creatives": lambda s: fetch_creatives(s, from_date, to_date, limit),
+        "devices":   lambda s: fetch_devices(s, from_date, to_date, limit),
+        "crm":       lambda s: fetch_crm(s, from_date, to_date, limit),
+        "kpi":       fetch_kpi,
+        "linechart": lambda s: fetch_linechart(s, from_date, to_date),
+        "utm":       lambda s: fetch_utm(s, limit),
+        "insights":  lambda s: fetch_insights(s, insights_limit),
+    }
+    results, errors = await run_sections(jobs, tenant_read_sessionmaker(), timeout)
+
+    models = {
+        "channels":  ChannelStats,
+        "creatives": CreativeStats,
+        "devices":   DeviceStats,
+        "crm":       CrmStats,
+        "linechart": LineChartPoint,
+        "utm":       UtmPerformance,
+        "insights":  Insight,
+    }
+    panels = {
+        name: to_models(model, results[name])
+        for name, model in models.items()
+        if name in results
+    }
+    if "kpi" in results:
+        if results["kpi"] is None:
+            errors["kpi"] = "not_found"
+        else:
+            panels["kpi"] = to_model(KpiMetrics, results["kpi"])
+
+    mark_partial(response, errors)
+    return DashboardSummary(**panels, errors=errors)
\ No newline at end of file
@@ -0,0 +1,55 @@
+from typing import List, Set
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.db import get_async_session
+from liderix_api.db_client_itstep import SessionItstepRead
+from liderix_api.models.client import Client
+from liderix_api.models.users import User
+from liderix_api.queries import registry
+from liderix_api.routes.insights.sales.route import SALES_AGENT
+from liderix_api.services.auth import get_current_user
+
+router = APIRouter()
+
+MAX_CLIENTS = 500
+MAX_AGENTS = 20
+
+
+async def _visible_clients(session: AsyncSession, user: User) -> Set[UUID]:
+    """Клиенты пользователя: свой (users.client_id) и те, где он владелец (агентство)."""
+    owned = await session.execute(select(Client.id).where(Client.owner_id == user.id))
+    visible = set(owned.scalars())
+    if user.client_id:
+        visible.add(user.client_id)
+    return visible
+
+
+@router.get("/")  # /api/insights/batch?client_id=…&client_id=…&agent_name=…
+async def get_insights_batch(
+    client_id: List[UUID] = Query(..., description="Клиенты (параметр повторяется)"),
+    agent_name: List[str] = Query([SALES_AGENT], description="Агенты (параметр повторяется)"),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Последний инсайт на каждую пару (client, agent) — один запрос вместо
+    отдельного HTTP-вызова и запроса на каждого клиента. Пары без инсайтов
+    в ответ не попадают. Только клиенты, доступные пользователю, иначе 403.
+    """
+    client_ids = sorted(set(client_id))
+    agent_names = sorted(set(agent_name))
+    if len(client_ids) > MAX_CLIENTS or len(agent_names) > MAX_AGENTS:
+        raise HTTPException(400, f"At most {MAX_CLIENTS} clients and {MAX_AGENTS} agents per request")
+
+    if not set(client_ids) <= await _visible_clients(session, current_user):
+        raise HTTPException(403, "No access to some of the requested clients")
+
+    async with SessionItstepRead() as insights_session:
+        rows = await registry.rows(
+            insights_session, "insights.latest_batch", client_ids=client_ids, agent_names=agent_names,
+        )
+    return [dict(row._mapping) for row in rows]
@@ -1,68 +1,93 @@
 from fastapi import APIRouter, Request
-from typing import List, Dict
-from liderix_api.db_client_itstep import SessionItstep
-from sqlalchemy import text  # ✅ ВАЖНО: для явного SQL-запроса
+from typing import Any, List, Dict
+from liderix_api.db_client_itstep import SessionItstepRead
+from liderix_api.queries import registry
+from liderix_api.services.mv_cache import mv_cache
 
 router = APIRouter()
 
+SALES_AGENT = "sales_insights_agent"
+
+# Ключ инсайта → тема на фронте
+KEY_TOPICS = {
+    "crm_sales_by_week": "weekly",
+    "crm_sales_daily": "daily",
+    "crm_sales_by_utm": "utm",
+    "crm_sales_by_channel": "channels",
+    "crm_sales_by_creative": "services",
+}
+
+# Ключ инсайта → ключевое слово, по которому к нему относятся рекомендации
+KEY_KEYWORDS = {
+    "crm_sales_by_week": "недел",
+    "crm_sales_daily": "день",
+    "crm_sales_by_utm": "utm",
+    "crm_sales_by_channel": "канал",
+    "crm_sales_by_creative": "креатив",
+}
+
+
 @router.get("/")  # ✅ Оставляем пустой путь, чтобы был /api/insights/sales
 async def get_sales_insights(request: Request):
     client_id = request.query_params.get("client_id")
     if not client_id:
         return []
 
-    async with SessionItstep() as session:
-        result = await session.execute(
-            text("""
-                SELECT summary, insights::jsonb, recommendations::jsonb
-                FROM ai.agent_insights
-                WHERE client_id = :client_id AND agent_name = 'sales_insights_agent'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """),
-            {"client_id": client_id}
-        )
-
-        row = result.first()
-        if not row:
+    async with SessionItstepRead() as session:
+        # 1. Только id последней записи — ответ по нему уже может быть в кэше
+        insight_id = (await registry.execute(
+            session, "insights.latest_id", client_id=client_id, agent_name=SALES_AGENT,
+        )).scalar()
+        if insight_id is None:
             return []
 
-        insights: Dict[str, List[str]] = row.insights
-        recommendations: List[Dict[str, str]] = row.recommendations
-
-        mapped = []
-        for key, value in insights.items():
-            mapped.append({
-                "topic": map_key_to_topic(key),
-                "summary": " ".join(value) if isinstance(value, list) else "",
-                "insights": value if isinstance(value, list) else [],
-                "recommendations": filter_recommendations(key, recommendations)
-            })
+        async def _load() -> List[Dict[str, Any]]:
+            row = (await registry.execute(session, "insights.by_id", id=insight_id)).first()
+            if not row:
+                return []
+            return build_sales_insights(row.insights, row.recommendations)
 
-        return mapped
+        # 2. Разметка считается один раз на запись (client, agent, id)
+        key = (client_id, "insights.sales", (("agent", SALES_AGENT), ("id", str(insight_id))))
+        return await mv_cache.get_or_load(key, _load)
 
 
 def map_key_to_topic(key: str) -> str:
-    mapping = {
-        "crm_sales_by_week": "weekly",
-        "crm_sales_daily": "daily",
-        "crm_sales_by_utm": "utm",
-        "crm_sales_by_channel": "channels",
-        "crm_sales_by_creative": "services",
-    }
-    return mapping.get(key, "sales")
+    return KEY_TOPICS.get(key, "sales")
 
 
-def filter_recommendations(key: str, recommendations: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    if not isinstance(recommendations, list):
+def build_sales_insights(
+    insights: Dict[str, List[str]],
+    recommendations: List[Dict[str, str]],
+) -> List[Dict[str, Any]]:
+    """
+    JSONB инсайта → ответ панели. Индекс ключевое слово → рекомендации строится
+    за один проход: каждая рекомендация приводится к нижнему регистру один раз.
+    """
+    if not isinstance(insights, dict):
         return []
 
-    keyword = {
-        "crm_sales_by_week": "недел",
-        "crm_sales_daily": "день",
-        "crm_sales_by_utm": "utm",
-        "crm_sales_by_channel": "канал",
-        "crm_sales_by_creative": "креатив",
-    }.get(key, "")
+    by_keyword: Dict[str, List[Dict[str, str]]] = {}
+    if isinstance(recommendations, list):
+        keywords = set(KEY_KEYWORDS.values())
+        for rec in recommendations:
+            text = str(rec.get("text") or "").lower() if isinstance(rec, dict) else ""
+            for kw in keywords:
+                if kw in text:
+                    by_keyword.setdefault(kw, []).append(rec)
 
-    return [r for r in recommendations if keyword.lower() in r["text"].lower()]
\ No newline at end of file
+    mapped = []
+    for key, value in insights.items():
+        keyword = KEY_KEYWORDS.get(key)
+        # Неизвестный ключ — пустое ключевое слово совпадает со всеми рекомендациями
+        if keyword:
+            recs = by_keyword.get(keyword, [])
+        else:
+            recs = list(recommendations) if isinstance(recommendations, list) else []
+        mapped.append({
+            "topic": map_key_to_topic(key),
+            "summary": " ".join(value) if isinstance(value, list) else "",
+            "insights": value if isinstance(value, list) else [],
+            "recommendations": recs,
+        })
+    return mapped
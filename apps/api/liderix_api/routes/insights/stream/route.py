@@ -0,0 +1,55 @@
+import asyncio
+import json
+from datetime import date
+from typing import Any
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from liderix_api.config import settings
+from liderix_api.services.insights_feed import insights_feed
+from liderix_api.services.mv_cache import current_client
+
+router = APIRouter()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, date):  # date и datetime
+        return value.isoformat()
+    return str(value)  # UUID и прочее
+
+
+def _sse(event: dict) -> str:
+    data = json.dumps(event, default=_json_default, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: insight\ndata: {data}\n\n"
+
+
+@router.get("/")  # /api/insights/stream
+async def stream_insights(request: Request):
+    """
+    Server-Sent Events: новые записи ai.agent_insights клиента запроса
+    (TenantMiddleware: claim client_id токена) по мере появления.
+    Фронт держит один EventSource вместо опроса /api/insights/sales и /dashboard/insights.
+    """
+    client_id = current_client.get()
+    queue = insights_feed.subscribe(client_id)
+
+    async def _events():
+        try:
+            yield f"retry: {int(settings.INSIGHTS_POLL_SECONDS * 1000)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.INSIGHTS_SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Комментарий-пинг держит соединение через прокси
+                    yield ": ping\n\n"
+                    continue
+                yield _sse(event)
+        finally:
+            insights_feed.unsubscribe(queue, client_id)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
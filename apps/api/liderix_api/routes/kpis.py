@@ -6,7 +6,7 @@ from datetime import datetime
 
 from liderix_api.models.kpi import KPI
 from liderix_api.schemas.kpis import KPICreate, KPIUpdate, KPIRead
-from liderix_api.db import get_async_session
+from liderix_api.db import get_async_session, get_read_session
 from liderix_api.services.auth import get_current_user
 from liderix_api.models.users import User
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/kpis", tags=["KPIs"])
 # 🔹 Получить все KPI пользователя
 @router.get("/", response_model=list[KPIRead])
 async def get_kpis(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     result = await session.execute(
@@ -27,7 +27,7 @@ async def get_kpis(
 @router.get("/{kpi_id}", response_model=KPIRead)
 async def get_kpi(
     kpi_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     kpi = await session.get(KPI, kpi_id)
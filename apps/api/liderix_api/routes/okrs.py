@@ -5,7 +5,7 @@ from uuid import UUID
 from datetime import datetime
 from liderix_api.models.okrs import OKR
 from liderix_api.schemas.okrs import OKRCreate, OKRUpdate, OKRRead
-from liderix_api.db import get_async_session
+from liderix_api.db import get_async_session, get_read_session
 from liderix_api.services.auth import get_current_user
 from liderix_api.models.users import User
 
@@ -14,7 +14,7 @@ router = APIRouter(tags=["OKRs"])  # Убрал prefix
 # 🔹 Получить все OKR пользователя
 @router.get("/okrs", response_model=list[OKRRead])
 async def get_okrs(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     result = await session.execute(
@@ -26,7 +26,7 @@ async def get_okrs(
 @router.get("/okrs/{okr_id}", response_model=OKRRead)
 async def get_okr(
     okr_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     okr = await session.get(OKR, okr_id)
@@ -6,7 +6,7 @@ from datetime import datetime
 
 from liderix_api.models.projects import Project
 from liderix_api.schemas.projects import ProjectCreate, ProjectUpdate, ProjectRead
-from liderix_api.db import get_async_session
+from liderix_api.db import get_async_session, get_read_session
 from liderix_api.services.auth import get_current_user
 from liderix_api.models.users import User
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/projects", tags=["Projects"])
 # 🔹 Получить все проекты текущего пользователя
 @router.get("/", response_model=list[ProjectRead])
 async def get_projects(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     result = await session.execute(
@@ -27,7 +27,7 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectRead)
 async def get_project(
     project_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     project = await session.get(Project, project_id)
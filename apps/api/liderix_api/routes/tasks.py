@@ -5,7 +5,7 @@ from uuid import UUID
 from datetime import datetime
 from liderix_api.models.tasks import Task
 from liderix_api.schemas.tasks import TaskRead, TaskCreate, TaskUpdate
-from liderix_api.db import get_async_session
+from liderix_api.db import get_async_session, get_read_session
 from liderix_api.services.auth import get_current_user
 from liderix_api.models.users import User
 
@@ -14,7 +14,7 @@ router = APIRouter(tags=["Tasks"])  # Убрал prefix, чтобы избежа
 # 🔹 Получить все задачи текущего пользователя
 @router.get("/tasks", response_model=list[TaskRead])
 async def get_tasks(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     result = await session.execute(
@@ -26,7 +26,7 @@ async def get_tasks(
 @router.get("/tasks/{task_id}", response_model=TaskRead)
 async def get_task(
     task_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     task = await session.get(Task, task_id)
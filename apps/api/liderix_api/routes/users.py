@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from liderix_api.models.users import User
 from liderix_api.schemas.user import UserRead, UserCreate, UserUpdate
-from liderix_api.db import get_async_session
+from liderix_api.db import get_async_session, get_read_session
 from liderix_api.services.auth import get_current_user  # ✅ Добавляем
 from uuid import UUID
 from datetime import datetime
@@ -16,7 +16,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # 🔹 Получить всех пользователей (только для авторизованных)
 @router.get("/", response_model=list[UserRead])
 async def get_users(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user)  # ✅ Авторизация
 ):
     result = await session.execute(select(User))
@@ -31,7 +31,7 @@ async def get_current_user_info(
 
 # 🔹 Получить одного пользователя по ID
 @router.get("/{user_id}", response_model=UserRead)
-async def get_user(user_id: UUID, session: AsyncSession = Depends(get_async_session)):
+async def get_user(user_id: UUID, session: AsyncSession = Depends(get_read_session)):
     user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import date
+from datetime import date as Date  # для полей с именем date
 
 
 class AdsDailyItem(BaseModel):
@@ -13,37 +14,44 @@ class AdsDailyItem(BaseModel):
     cpm: float
 
 
+# Поля сущности и date заполнены в зависимости от group_by
+
 class AdsCampaignItem(BaseModel):
-    campaign_id: str
-    campaign_name: Optional[str]
+    date: Optional[Date] = None
+    campaign_id: Optional[str] = None
+    campaign_name: Optional[str] = None
     spend: float
     clicks: int
     conversions: int
     ctr: float
     cpc: float
     cpa: float
+    ctr_missing_days: int = 0  # дни с кликами, но без CTR — не вошли в CTR
 
 
 class AdsAdGroupItem(BaseModel):
-    ad_group_id: str
-    ad_group_name: str
+    date: Optional[Date] = None
+    ad_group_id: Optional[str] = None
+    ad_group_name: Optional[str] = None
     spend: float
     clicks: int
     conversions: int
     ctr: float
     cpc: float
     cpa: float
+    ctr_missing_days: int = 0  # дни с кликами, но без CTR — не вошли в CTR
 
 
 class AdsPlatformItem(BaseModel):
-    platform: str
+    date: Optional[Date] = None
+    platform: Optional[str] = None
     spend: float
     impressions: int
     clicks: int
     conversions: int
     ctr: float
     cpc: float
-    cpa: float
+    cpa: Optional[float] = None
 
 
 class AdsUtmItem(BaseModel):
@@ -60,8 +68,10 @@ class AdsUtmItem(BaseModel):
 
 
 class AdsAnalyticsResponse(BaseModel):
-    daily: List[AdsDailyItem]
-    campaigns: List[AdsCampaignItem]
-    adGroups: List[AdsAdGroupItem]
-    platforms: List[AdsPlatformItem]
-    utm: List[AdsUtmItem]
\ No newline at end of file
+    # None — секция не загрузилась (таймаут/ошибка), причина в errors
+    daily: Optional[List[AdsDailyItem]] = None
+    campaigns: Optional[List[AdsCampaignItem]] = None
+    adGroups: Optional[List[AdsAdGroupItem]] = None
+    platforms: Optional[List[AdsPlatformItem]] = None
+    utm: Optional[List[AdsUtmItem]] = None
+    errors: Dict[str, str] = {}
\ No newline at end of file
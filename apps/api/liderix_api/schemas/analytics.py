@@ -64,11 +64,14 @@ class CustomerMetricsItem(BaseModel):
 
 # 📊 ROAS по кампаниям
 class CampaignROASItem(BaseModel):
+    period_start: Optional[date] = None  # None — весь период целиком
     campaign_id: str
     campaign_name: str
     spend: float
     revenue: float
     roas: float
+    contracts: int = 0
+    cac: Optional[float] = None  # None — договоров нет
 
 # 🌐 Трафик по каналам
 class TrafficItem(BaseModel):
@@ -94,6 +97,17 @@ class ForecastItem(BaseModel):
     value: float
     predicted_value: float
     delta: float
+    model: Optional[str] = None  # seasonal_naive / holt_winters / linear_trend
+
+# 🚨 Аномалия в дневном ряду
+class AnomalyItem(BaseModel):
+    date: date
+    metric: str
+    value: float
+    expected: float
+    score: float       # отклонение в σ (z-score / робастный z по MAD)
+    direction: str     # up / down
+    method: str
 
 # 🧩 Воронка
 class FunnelStep(BaseModel):
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 from datetime import date
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class ChannelStats(BaseModel):
@@ -47,6 +48,24 @@ class KpiMetrics(BaseModel):
     cpc: float
     roas: float
 
+class KpiDelta(BaseModel):
+    current: float
+    previous: float
+    delta: float
+    delta_pct: Optional[float] = None  # None, если в предыдущем периоде 0
+
+class KpiComparison(BaseModel):
+    from_date: date
+    to_date: date
+    prev_from_date: date
+    prev_to_date: date
+    revenue: KpiDelta
+    contracts_count: KpiDelta
+    avg_check: KpiDelta
+    ctr: KpiDelta
+    cpc: KpiDelta
+    roas: KpiDelta
+
 class LineChartPoint(BaseModel):
     date: date
     spend: float
@@ -56,4 +75,15 @@ class LineChartPoint(BaseModel):
 class UtmPerformance(BaseModel):
     utm_campaign: str
     total_conversions: int
-    total_revenue: float
\ No newline at end of file
+    total_revenue: float
+
+class DashboardSummary(BaseModel):
+    channels: Optional[List[ChannelStats]] = None
+    creatives: Optional[List[CreativeStats]] = None
+    devices: Optional[List[DeviceStats]] = None
+    crm: Optional[List[CrmStats]] = None
+    kpi: Optional[KpiMetrics] = None
+    linechart: Optional[List[LineChartPoint]] = None
+    utm: Optional[List[UtmPerformance]] = None
+    insights: Optional[List[Insight]] = None
+    errors: Dict[str, str] = {}  # панель → "timeout" / "error" / "not_found"
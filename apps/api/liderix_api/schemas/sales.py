@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import date
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 # 📆 Продажи по дням
@@ -11,10 +11,29 @@ class SalesDailyItem(BaseModel):
     total_first_sum: float
 
 
-# 📅 Продажи по неделям
+# 📅 Продажи по неделям (свёртка посуточного ряда)
 class SalesWeeklyItem(BaseModel):
     week_start: date
     total_revenue: float
+    contract_count: Optional[int] = None
+    total_first_sum: Optional[float] = None
+
+
+# 🗓 Продажи по месяцам / кварталам
+class SalesPeriodItem(BaseModel):
+    period_start: date
+    contract_count: int
+    total_revenue: float
+    total_first_sum: float
+
+
+# 📈 Посуточный тренд: нарастающие итоги и скользящее среднее
+class SalesTrendItem(BaseModel):
+    date: date
+    total_revenue: float
+    revenue_cumulative: float
+    revenue_ma: float
+    contracts_cumulative: int
 
 
 # 🧾 Продажи по услугам
@@ -49,6 +68,11 @@ class SalesByUtmItem(BaseModel):
 class SalesAnalyticsResponse(BaseModel):
     daily: List[SalesDailyItem]
     weekly: List[SalesWeeklyItem]
+    monthly: List[SalesPeriodItem] = []
+    quarterly: List[SalesPeriodItem] = []
+    trend: List[SalesTrendItem] = []
     byService: List[SalesByServiceItem]
     byBranch: List[SalesByBranchItem]
-    byUtm: List[SalesByUtmItem]
\ No newline at end of file
+    byUtm: List[SalesByUtmItem]
+    # Разрез → "range" | "all_time" (посуточной витрины нет, период не учтён)
+    breakdownScope: Dict[str, str] = {}
\ No newline at end of file
@@ -1,78 +1,59 @@
 # ✅ Service — fetch_ads_analytics
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from liderix_api.config import settings
+from liderix_api.tenants import tenant_read_sessionmaker
+from liderix_api.queries import registry, to_models
+from liderix_api.queries.ads import DEFAULT_GROUP_BY, grouped_query
 from liderix_api.schemas.ads import *
+from liderix_api.services.day_cache import day_cache
+from liderix_api.utils.parallel import run_sections
 from datetime import date, timedelta
-from typing import Optional
+from typing import Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
 
 async def fetch_ads_analytics(
-    db: AsyncSession,
+    db: Optional[AsyncSession] = None,
     from_date: Optional[date] = None,
-    to_date: Optional[date] = None
+    to_date: Optional[date] = None,
+    group_by: Sequence[str] = DEFAULT_GROUP_BY,
+    session_factory=None,
+    timeout: float = settings.ADS_SECTION_TIMEOUT,
 ) -> AdsAnalyticsResponse:
-    try:
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-
-        from_dt = from_date or (yesterday - timedelta(days=6))
-        to_dt = (to_date or yesterday) + timedelta(days=1)
-
-        params = {
-            "from": from_dt,
-            "to": to_dt,
-        }
-
-        # 1. KPI по дням
-        daily_query = await db.execute(text("""
-            SELECT dt AS date, spend, clicks, impressions, ctr, cpc, cpm
-            FROM dashboards.ads_campaigns_kpi_daily
-            WHERE dt >= :from AND dt < :to
-            ORDER BY dt
-        """), params)
-        daily = [AdsDailyItem(**row._mapping) for row in daily_query.fetchall()]
-
-        # 2. Кампании
-        campaigns_query = await db.execute(text("""
-            SELECT campaign_id, campaign_key as campaign_name, spend, clicks, conversions, ctr, cpc, cpa
-            FROM dashboards.ads_campaigns_daily
-            WHERE dt >= :from AND dt < :to
-        """), params)
-        campaigns = [AdsCampaignItem(**row._mapping) for row in campaigns_query.fetchall()]
-
-        # 3. AdGroups
-        adgroups_query = await db.execute(text("""
-            SELECT ad_group_id, ad_group_name, spend, clicks, conversions, ctr, cpc, cpa
-            FROM dashboards.google_ads_adgroup_daily
-            WHERE dt >= :from AND dt < :to
-        """), params)
-        adGroups = [AdsAdGroupItem(**row._mapping) for row in adgroups_query.fetchall()]
-
-        # 4. Platforms
-        platforms_query = await db.execute(text("""
-            SELECT platform, spend, impressions, clicks, COALESCE(conversions, 0) as conversions, ctr, cpc, COALESCE(cpa, 0) as cpa
-            FROM dashboards.ads_platform_daily
-            WHERE dt >= :from AND dt < :to
-        """), params)
-        platforms = [AdsPlatformItem(**row._mapping) for row in platforms_query.fetchall()]
-
-        # 5. UTM
-        utm_query = await db.execute(text("""
-            SELECT date, utm_source, utm_medium, utm_campaign, sessions, conversions, spend, conv_rate, cpa, cps
-            FROM dashboards.ads_by_utm_daily
-            WHERE date >= :from AND date < :to
-        """), params)
-        utm = [AdsUtmItem(**row._mapping) for row in utm_query.fetchall()]
-
-        return AdsAnalyticsResponse(
-            daily=daily,
-            campaigns=campaigns,
-            adGroups=adGroups,
-            platforms=platforms,
-            utm=utm
-        )
-
-    except Exception as e:
-        print("[❌ ADS Service Error]:", e)
-        return AdsAnalyticsResponse(
-            daily=[], campaigns=[], adGroups=[], platforms=[], utm=[]
-        )
\ No newline at end of file
+    """
+    db — устаревший параметр, оставлен для совместимости вызовов
+    fetch_ads_analytics(db, from_date, to_date) и не используется: секции идут
+    параллельно, каждой нужна своя сессия — их даёт session_factory
+    (по умолчанию — чтение БД клиента текущего запроса).
+    """
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+
+    from_dt = from_date or (yesterday - timedelta(days=6))
+    to_dt = (to_date or yesterday) + timedelta(days=1)
+
+    params = {
+        "from_date": from_dt,
+        "to_date": to_dt,
+    }
+
+    campaigns_q = grouped_query("campaigns", group_by)
+    adgroups_q = grouped_query("adgroups", group_by)
+    platforms_q = grouped_query("platforms", group_by)
+
+    async def _daily(db, dataset: str, schema):
+        # 🗓 Из посуточного кэша; to_dt — исключающая граница
+        _, rows = await day_cache.fetch(db, dataset, from_dt, to_dt - timedelta(days=1))
+        return to_models(schema, rows)
+
+    # ⚡ Секции параллельно, каждая на своей сессии; упавшая не обнуляет остальные
+    results, errors = await run_sections({
+        "daily": lambda db: _daily(db, "ads.daily", AdsDailyItem),
+        "campaigns": lambda db: registry.models(db, campaigns_q, **params),
+        "adGroups": lambda db: registry.models(db, adgroups_q, **params),
+        "platforms": lambda db: registry.models(db, platforms_q, **params),
+        "utm": lambda db: _daily(db, "ads.utm", AdsUtmItem),
+    }, session_factory or tenant_read_sessionmaker(), timeout)
+
+    if errors:
+        print("[❌ ADS Service Error]:", errors)
+
+    return AdsAnalyticsResponse.model_construct(**results, errors=errors)
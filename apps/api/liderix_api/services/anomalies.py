@@ -0,0 +1,260 @@
+# apps/api/liderix_api/services/anomalies.py
+
+import asyncio
+import warnings
+from datetime import date, timedelta
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.config import settings
+from liderix_api.queries import registry
+from liderix_api.schemas.analytics import AnomalyItem
+from liderix_api.services.mv_cache import CacheKey, mv_cache
+
+# 🚨 Детекторы аномалий над матрицей (ряды × дни). Каждая точка сравнивается
+# только с прошлым (окно перед ней), все ряды считаются одной операцией.
+# Возвращают (ожидаемое значение, score); NaN — истории для точки не хватило.
+# Пропущенные дни (NaN) не входят в окна и сами не оцениваются; окно
+# засчитывается, если в нём есть хотя бы MIN_OBSERVED доля наблюдений.
+
+Method = Literal["zscore", "mad", "seasonal"]
+
+MAD_SCALE = 1.4826  # MAD → σ для нормального распределения
+SCORE_CAP = 1e3     # плоский ряд (σ = 0): любое отклонение даёт inf — обрезаем
+MIN_OBSERVED = 0.5  # минимальная доля непропущенных дней в окне
+
+
+def _trailing(Y: np.ndarray, window: int) -> np.ndarray:
+    """(n, T) → (n, T - window, window): окно из window дней перед каждой точкой."""
+    return sliding_window_view(Y, window, axis=1)[:, :-1]
+
+
+def _pad(values: np.ndarray, T: int) -> np.ndarray:
+    out = np.full(values.shape[:1] + (T,), np.nan)
+    out[:, T - values.shape[1]:] = values
+    return out
+
+
+def rolling_zscore(Y: np.ndarray, window: int = 28) -> Tuple[np.ndarray, np.ndarray]:
+    n, T = Y.shape
+    if T <= window:
+        return np.full((n, T), np.nan), np.full((n, T), np.nan)
+    observed = ~np.isnan(Y)
+    Y0 = np.where(observed, Y, 0.0)
+
+    def _window_sums(X: np.ndarray) -> np.ndarray:
+        c = np.cumsum(np.pad(X, ((0, 0), (1, 0))), axis=1)
+        return c[:, window:-1] - c[:, :-window - 1]
+
+    count = _window_sums(observed.astype(np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = _window_sums(Y0) / count
+        std = np.sqrt(np.maximum(_window_sums(Y0 ** 2) / count - mean ** 2, 0))
+        mean[count < window * MIN_OBSERVED] = np.nan
+        score = (Y[:, window:] - mean) / std
+    return _pad(mean, T), _pad(score, T)
+
+
+def rolling_mad(Y: np.ndarray, window: int = 28) -> Tuple[np.ndarray, np.ndarray]:
+    n, T = Y.shape
+    if T <= window:
+        return np.full((n, T), np.nan), np.full((n, T), np.nan)
+    windows = _trailing(Y, window)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # окна целиком из пропусков → NaN
+        median = np.nanmedian(windows, axis=2)
+        mad = np.nanmedian(np.abs(windows - median[:, :, None]), axis=2) * MAD_SCALE
+    median[(~np.isnan(windows)).sum(axis=2) < window * MIN_OBSERVED] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = (Y[:, window:] - median) / mad
+    return _pad(median, T), _pad(score, T)
+
+
+def seasonal_score(Y: np.ndarray, season: int = 7, periods: int = 4, window: int = 28) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ожидаемое — медиана тех же дней недели за periods прошлых сезонов;
+    score — остаток, нормированный на MAD остатков за window дней.
+    """
+    n, T = Y.shape
+    lag = season * periods
+    if T <= lag + window:
+        return np.full((n, T), np.nan), np.full((n, T), np.nan)
+    # Те же дни недели: t - 7, t - 14, ... t - 7 * periods
+    same_day = np.stack([Y[:, lag - k * season: T - k * season] for k in range(1, periods + 1)], axis=2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        expected = np.nanmedian(same_day, axis=2)
+    resid = Y[:, lag:] - expected
+    _, resid_score = rolling_mad(resid, window)
+    return _pad(expected, T), _pad(resid_score, T)
+
+
+DETECTORS = {"zscore": rolling_zscore, "mad": rolling_mad, "seasonal": seasonal_score}
+
+SERIES = ("spend", "ctr", "cpc", "ads_revenue", "revenue", "contracts", "sessions")
+
+
+def detect(Y: np.ndarray, method: Method, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Маска аномалий, ожидаемые значения и score для всей матрицы."""
+    expected, score = DETECTORS[method](np.asarray(Y, dtype=np.float64))
+    score = np.clip(score, -SCORE_CAP, SCORE_CAP)  # nan (0 / 0) остаётся nan
+    mask = np.abs(np.nan_to_num(score)) >= threshold
+    return mask, expected, score
+
+
+ANOMALIES_ENDPOINT = "analytics.anomalies"
+
+
+def _key(client: str, to_date: date) -> CacheKey:
+    # to_date — часть ключа: после полуночи окно сдвигается без refresh витрин
+    return (client, ANOMALIES_ENDPOINT, (("to_date", to_date.isoformat()),))
+
+
+async def _load_series(session: AsyncSession, from_date: date, to_date: date) -> np.ndarray:
+    """Ряды SERIES клиента на сплошном календаре [from_date, to_date]: (len(SERIES), дни)."""
+    rows = await registry.rows(session, "anomalies.daily", from_date=from_date, to_date=to_date)
+    # None (дня нет в витрине) → NaN
+    Y = np.array([[getattr(r, name) for r in rows] for name in SERIES], dtype=np.float64)
+    return Y.reshape(len(SERIES), len(rows))
+
+
+async def scan_clients(
+    clients: Sequence[str],
+    to_date: date,
+    days: int,
+    history: int,
+    min_score: float,
+) -> Dict[str, List[AnomalyItem]]:
+    """
+    Пакет по клиентам: ряды грузятся параллельно, складываются в одну
+    матрицу (клиенты × SERIES) и каждый детектор проходит её одной операцией.
+    В mv_cache клиента кладутся точки последних days дней с |score| >=
+    min_score по всем методам — роут только фильтрует их по method / threshold.
+    """
+    from liderix_api.tenants import tenants  # tenants → services.auth → db: не на уровне модуля
+
+    from_date = to_date - timedelta(days=history + days - 1)
+    generations = {c: mv_cache.generation(c) for c in clients}
+
+    async def _load(client: str) -> np.ndarray:
+        async with tenants.read_sessionmaker(client)() as session:
+            return await _load_series(session, from_date, to_date)
+
+    loaded = await asyncio.gather(*(_load(c) for c in clients), return_exceptions=True)
+    blocks: Dict[str, np.ndarray] = {}
+    for client, result in zip(clients, loaded):
+        if isinstance(result, BaseException):
+            print(f"[❌] Anomaly series for client {client} failed:", repr(result))
+        elif result.shape[1]:
+            blocks[client] = result
+    if not blocks:
+        return {}
+
+    # Календарь у всех один (generate_series по одним датам) — блоки одной ширины
+    Y = np.vstack(list(blocks.values()))
+    T = Y.shape[1]
+    dates = [from_date + timedelta(days=t) for t in range(T)]
+    n = len(SERIES)
+    names = list(blocks)
+    results: Dict[str, List[AnomalyItem]] = {client: [] for client in names}
+    for method in DETECTORS:
+        mask, expected, score = detect(Y, method, min_score)
+        mask[:, : max(0, T - days)] = False
+        for row, t in zip(*np.nonzero(mask)):
+            k, i = divmod(int(row), n)
+            results[names[k]].append(AnomalyItem(
+                date=dates[t],
+                metric=SERIES[i],
+                value=float(Y[row, t]),
+                expected=float(expected[row, t]),
+                score=float(score[row, t]),
+                direction="up" if Y[row, t] > expected[row, t] else "down",
+                method=method,
+            ))
+
+    for client, items in results.items():
+        # Свежие дни первыми, внутри дня — по силе отклонения
+        items.sort(key=lambda a: (-a.date.toordinal(), -abs(a.score)))
+        # Витрина обновилась, пока шёл пакет — результат уже устарел, пересчитаем
+        if mv_cache.generation(client) == generations[client]:
+            mv_cache.set(_key(client, to_date), items)
+    print(f"[🚨] Anomaly scan: {len(blocks)} client(s), {Y.shape[0]} series")
+    return results
+
+
+def get_anomalies(
+    client: str,
+    to_date: date,
+    days: int,
+    method: Method = "seasonal",
+    threshold: float = 3.5,
+) -> Optional[List[AnomalyItem]]:
+    """
+    Аномальные дни клиента за days дней по to_date включительно — только из
+    результата пакета в mv_cache (AnomalyScan). None — пакет ещё не посчитан
+    (первый запуск или refresh витрин только что сбросил результат).
+    """
+    hit, items = mv_cache.get(_key(client, to_date))
+    if not hit:
+        return None
+    since = to_date - timedelta(days=days - 1)
+    return [a for a in items if a.method == method and a.date >= since and abs(a.score) >= threshold]
+
+
+class AnomalyScan:
+    """
+    Цикл пакета аномалий: раз в interval секунд находит клиентов, чей
+    результат пропал из mv_cache (refresh витрин, истёк ttl без известной
+    версии, наступил новый день), и пересчитывает их одним scan_clients.
+    """
+
+    def __init__(self, interval: float, days: int, history: int, min_score: float):
+        self.interval = interval
+        self.days = days
+        self.history = history
+        self.min_score = min_score
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        from liderix_api.tenants import tenants
+
+        to_date = date.today() - timedelta(days=1)
+        clients = [settings.ITSTEP_CLIENT_ID, *tenants.urls]
+        stale = [c for c in clients if not mv_cache.get(_key(c, to_date))[0]]
+        if stale:
+            await scan_clients(stale, to_date, self.days, self.history, self.min_score)
+        return len(stale)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[❌] Anomaly scan failed:", repr(e))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+anomaly_scan = AnomalyScan(
+    interval=settings.ANOMALY_SCAN_SECONDS,
+    days=settings.ANOMALY_SCAN_DAYS,
+    history=settings.ANOMALY_SCAN_HISTORY,
+    min_score=settings.ANOMALY_MIN_SCORE,
+)
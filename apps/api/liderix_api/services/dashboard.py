@@ -1,20 +1,162 @@
-from datetime import date
-from typing import List, Optional
+from datetime import date, timedelta
+from typing import List, Literal, Optional, Sequence
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from asyncpg import InsufficientPrivilegeError
 
-from ...schemas.dashboard import (
+from liderix_api.queries import registry, to_model, to_models
+from liderix_api.services.mv_cache import mv_cache
+from liderix_api.schemas.dashboard import (
     ChannelStats,
     CreativeStats,
     DeviceStats,
     CrmStats,
     Insight,
     KpiMetrics,
+    KpiDelta,
+    KpiComparison,
     LineChartPoint,
     UtmPerformance,
 )
 
+Granularity = Literal["day", "week", "month"]
+
+
+# --- Строки витрин (общие для роутов дашборда и функций ниже) ---
+# Витрины analytics.mv_* меняются только при refresh — результаты кэшируются
+# до смены версии данных (см. services/mv_cache.py). Инсайты не кэшируем.
+# after — ключ сортировки последней строки предыдущей страницы (keyset-пагинация).
+
+@mv_cache.cached("dashboard.channels")
+async def fetch_channels(
+    session: AsyncSession,
+    from_date: date,
+    to_date: date,
+    limit: int,
+    after: Optional[Sequence] = None,
+) -> Sequence[Row]:
+    if not after:
+        return await registry.rows(session, "dashboard.channels",
+                                   from_date=from_date, to_date=to_date, limit=limit)
+    return await registry.rows(
+        session, "dashboard.channels.after",
+        from_date=from_date, to_date=to_date, limit=limit,
+        after_date=after[0], after_channel=after[1], after_source=after[2], after_medium=after[3],
+    )
+
+
+@mv_cache.cached("dashboard.creatives")
+async def fetch_creatives(
+    session: AsyncSession,
+    from_date: date,
+    to_date: date,
+    limit: int,
+    after: Optional[Sequence] = None,
+) -> Sequence[Row]:
+    if not after:
+        return await registry.rows(session, "dashboard.creatives",
+                                   from_date=from_date, to_date=to_date, limit=limit)
+    return await registry.rows(
+        session, "dashboard.creatives.after",
+        from_date=from_date, to_date=to_date, limit=limit,
+        after_ctr=after[0], after_date=after[1], after_creative=after[2],
+    )
+
+
+@mv_cache.cached("dashboard.devices")
+async def fetch_devices(
+    session: AsyncSession,
+    from_date: date,
+    to_date: date,
+    limit: int,
+    after: Optional[Sequence] = None,
+) -> Sequence[Row]:
+    if not after:
+        return await registry.rows(session, "dashboard.devices",
+                                   from_date=from_date, to_date=to_date, limit=limit)
+    return await registry.rows(
+        session, "dashboard.devices.after",
+        from_date=from_date, to_date=to_date, limit=limit,
+        after_date=after[0], after_device=after[1],
+    )
+
+
+@mv_cache.cached("dashboard.crm")
+async def fetch_crm(
+    session: AsyncSession,
+    from_date: date,
+    to_date: date,
+    limit: int,
+    after: Optional[Sequence] = None,
+) -> Sequence[Row]:
+    if not after:
+        return await registry.rows(session, "dashboard.crm",
+                                   from_date=from_date, to_date=to_date, limit=limit)
+    return await registry.rows(
+        session, "dashboard.crm.after",
+        from_date=from_date, to_date=to_date, limit=limit,
+        after_date=after[0], after_source=after[1],
+    )
+
+
+async def fetch_insights(session: AsyncSession, limit: int) -> Sequence[Row]:
+    try:
+        return await registry.rows(session, "dashboard.insights", limit=limit)
+    except InsufficientPrivilegeError:
+        # если нет прав на схему ai — просто вернём пустой список
+        return []
+
+
+@mv_cache.cached("dashboard.kpi")
+async def fetch_kpi(session: AsyncSession) -> Optional[Row]:
+    return await registry.one(session, "dashboard.kpi")
+
+
+@mv_cache.cached("dashboard.kpi.compare")
+async def fetch_kpi_comparison(session: AsyncSession, from_date: date, to_date: date) -> Row:
+    prev_from, prev_to = previous_period(from_date, to_date)
+    return await registry.one(session, "dashboard.kpi.compare",
+                              cur_from=from_date, cur_to=to_date,
+                              prev_from=prev_from, prev_to=prev_to)
+
+
+@mv_cache.cached("dashboard.linechart")
+async def fetch_linechart(
+    session: AsyncSession,
+    from_date: Optional[date],
+    to_date: Optional[date],
+    granularity: Granularity = "day",
+) -> Sequence[Row]:
+    return await registry.rows(session, f"dashboard.linechart.{granularity}",
+                               from_date=from_date, to_date=to_date)
+
+
+@mv_cache.cached("dashboard.utm")
+async def fetch_utm(session: AsyncSession, limit: int) -> Sequence[Row]:
+    return await registry.rows(session, "dashboard.utm", limit=limit)
+
+
+# --- Модели ---
+
+def previous_period(from_date: date, to_date: date) -> tuple:
+    """Предыдущий период той же длины, заканчивающийся накануне from_date."""
+    length = (to_date - from_date).days + 1
+    prev_to = from_date - timedelta(days=1)
+    return prev_to - timedelta(days=length - 1), prev_to
+
+
+def _ratio(num: float, den: float) -> float:
+    return num / den if den else 0.0
+
+
+def _delta(current: float, previous: float) -> KpiDelta:
+    return KpiDelta(
+        current=current,
+        previous=previous,
+        delta=current - previous,
+        delta_pct=(current - previous) / previous * 100 if previous else None,
+    )
 
 async def get_channels(
     session: AsyncSession,
@@ -25,18 +167,7 @@ async def get_channels(
     """
     Возвращает статистику по каналам за заданный период.
     """
-    sql = """
-        SELECT date, source, medium, sessions, users, bounce_rate
-        FROM analytics.mv_channel_traffic_daily
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY date DESC
-        LIMIT :limit
-    """
-    result = await session.execute(
-        text(sql),
-        {"from_date": from_date, "to_date": to_date, "limit": limit},
-    )
-    return [ChannelStats(**row._mapping) for row in result.fetchall()]
+    return to_models(ChannelStats, await fetch_channels(session, from_date, to_date, limit))
 
 
 async def get_creatives(
@@ -48,18 +179,7 @@ async def get_creatives(
     """
     Возвращает показатели по креативам за заданный период.
     """
-    sql = """
-        SELECT date, creative, impressions, clicks, ctr
-        FROM analytics.mv_creative_performance
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY ctr DESC
-        LIMIT :limit
-    """
-    result = await session.execute(
-        text(sql),
-        {"from_date": from_date, "to_date": to_date, "limit": limit},
-    )
-    return [CreativeStats(**row._mapping) for row in result.fetchall()]
+    return to_models(CreativeStats, await fetch_creatives(session, from_date, to_date, limit))
 
 
 async def get_devices(
@@ -71,18 +191,7 @@ async def get_devices(
     """
     Возвращает использование устройств за заданный период.
     """
-    sql = """
-        SELECT date, device_type, sessions, users
-        FROM analytics.mv_device_usage_daily
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY date DESC
-        LIMIT :limit
-    """
-    result = await session.execute(
-        text(sql),
-        {"from_date": from_date, "to_date": to_date, "limit": limit},
-    )
-    return [DeviceStats(**row._mapping) for row in result.fetchall()]
+    return to_models(DeviceStats, await fetch_devices(session, from_date, to_date, limit))
 
 
 async def get_crm(
@@ -94,18 +203,7 @@ async def get_crm(
     """
     Возвращает CRM-показатели по источникам за заданный период.
     """
-    sql = """
-        SELECT date, source, deals_started, deals_closed, revenue
-        FROM analytics.mv_crm_by_source_daily
-        WHERE date BETWEEN :from_date AND :to_date
-        ORDER BY date DESC
-        LIMIT :limit
-    """
-    result = await session.execute(
-        text(sql),
-        {"from_date": from_date, "to_date": to_date, "limit": limit},
-    )
-    return [CrmStats(**row._mapping) for row in result.fetchall()]
+    return to_models(CrmStats, await fetch_crm(session, from_date, to_date, limit))
 
 
 async def get_insights(
@@ -115,14 +213,7 @@ async def get_insights(
     """
     Возвращает последние AI-инсайты.
     """
-    sql = """
-        SELECT summary, insights, recommendations, agent_name, insight_date
-        FROM ai.agent_insights
-        ORDER BY created_at DESC
-        LIMIT :limit
-    """
-    result = await session.execute(text(sql), {"limit": limit})
-    return [Insight(**row._mapping) for row in result.fetchall()]
+    return to_models(Insight, await fetch_insights(session, limit))
 
 
 async def get_kpi(
@@ -131,34 +222,33 @@ async def get_kpi(
     """
     Возвращает сводные KPI-метрики: финансы и реклама.
     """
-    rev_sql = """
-        SELECT total_revenue, contracts_count, avg_contract_value
-        FROM analytics.mv_daily_revenue
-        ORDER BY date DESC
-        LIMIT 1
-    """
-    ads_sql = """
-        SELECT ctr, cpc, roas
-        FROM analytics.mv_ads_overview_daily
-        ORDER BY date DESC
-        LIMIT 1
-    """
-
-    rev_res = await session.execute(text(rev_sql))
-    ads_res = await session.execute(text(ads_sql))
-
-    rev = rev_res.fetchone()
-    ads = ads_res.fetchone()
-    if rev is None or ads is None:
+    row = await fetch_kpi(session)
+    if row is None:
         raise ValueError("KPI data not found")
+    return to_model(KpiMetrics, row)
 
-    return KpiMetrics(
-        revenue=rev._mapping["total_revenue"],
-        contracts_count=rev._mapping["contracts_count"],
-        avg_check=rev._mapping["avg_contract_value"],
-        ctr=ads._mapping["ctr"],
-        cpc=ads._mapping["cpc"],
-        roas=ads._mapping["roas"],
+
+async def get_kpi_comparison(
+    session: AsyncSession,
+    from_date: date,
+    to_date: date,
+) -> KpiComparison:
+    """
+    KPI за период против предыдущего периода той же длины: текущее, прошлое, дельта.
+    """
+    r = await fetch_kpi_comparison(session, from_date, to_date)
+    prev_from, prev_to = previous_period(from_date, to_date)
+    return KpiComparison(
+        from_date=from_date,
+        to_date=to_date,
+        prev_from_date=prev_from,
+        prev_to_date=prev_to,
+        revenue=_delta(r.cur_revenue, r.prev_revenue),
+        contracts_count=_delta(r.cur_contracts, r.prev_contracts),
+        avg_check=_delta(_ratio(r.cur_revenue, r.cur_contracts), _ratio(r.prev_revenue, r.prev_contracts)),
+        ctr=_delta(r.cur_ctr, r.prev_ctr),
+        cpc=_delta(r.cur_cpc, r.prev_cpc),
+        roas=_delta(_ratio(r.cur_ads_revenue, r.cur_cost), _ratio(r.prev_ads_revenue, r.prev_cost)),
     )
 
 
@@ -166,20 +256,12 @@ async def get_linechart(
     session: AsyncSession,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
+    granularity: Granularity = "day",
 ) -> List[LineChartPoint]:
     """
     Возвращает точки для линейного графика ROAS за период.
     """
-    sql = """
-        SELECT date, cost AS spend, revenue AS revenue_sum, roas
-        FROM analytics.mv_ads_overview_daily
-        WHERE (:from_date IS NULL OR date >= :from_date)
-          AND (:to_date   IS NULL OR date <= :to_date)
-        ORDER BY date ASC
-    """
-    params = {"from_date": from_date, "to_date": to_date}
-    result = await session.execute(text(sql), params)
-    return [LineChartPoint(**row._mapping) for row in result.fetchall()]
+    return to_models(LineChartPoint, await fetch_linechart(session, from_date, to_date, granularity))
 
 
 async def get_utm_performance(
@@ -189,11 +271,4 @@ async def get_utm_performance(
     """
     Возвращает эффективность UTM-кампаний.
     """
-    sql = """
-        SELECT utm_campaign, total_conversions, total_revenue
-        FROM analytics.mv_utm_performance
-        ORDER BY total_conversions DESC
-        LIMIT :limit
-    """
-    result = await session.execute(text(sql), {"limit": limit})
-    return [UtmPerformance(**row._mapping) for row in result.fetchall()]
\ No newline at end of file
+    return to_models(UtmPerformance, await fetch_utm(session, limit))
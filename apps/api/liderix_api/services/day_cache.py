@@ -0,0 +1,140 @@
+# apps/api/liderix_api/services/day_cache.py
+
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.config import settings
+from liderix_api.queries import registry
+from liderix_api.services.mv_cache import MVCache, current_client, mv_cache
+from liderix_api.utils.lru import BoundedLRU
+
+
+@dataclass(frozen=True)
+class DayDataset:
+    """Запрос с параметрами from_date / to_date, строки которого привязаны к дню."""
+    query: str
+    date_field: str = "date"
+    exclusive_end: bool = False  # to_date не входит в диапазон (dt < :to_date)
+
+
+DAY_DATASETS: Dict[str, DayDataset] = {
+    "ads.daily": DayDataset("ads.daily", exclusive_end=True),
+    "ads.utm": DayDataset("ads.utm", exclusive_end=True),
+    "sales.daily": DayDataset("sales.daily"),
+}
+
+DayKey = Tuple[str, str, date]
+
+
+def _runs(days: Sequence[date]) -> List[Tuple[date, date]]:
+    """Сортированные дни → непрерывные отрезки [start, end]."""
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _days(start: date, end: date):
+    return (start + timedelta(days=i) for i in range((end - start).days + 1))
+
+
+class DayCache:
+    """
+    Кэш результатов по дням: (client, dataset, day) → строки этого дня.
+
+    Прошлые дни после REFRESH витрин не меняются, поэтому запрос диапазона
+    собирается из закэшированных дней, а в БД уходят только недостающие
+    отрезки. Сегодняшний день не кэшируется — он ещё дописывается.
+    Каждая запись помечена версией данных из mv_cache: после refresh
+    старые дни считаются промахом и перечитываются. Пока версия не
+    известна (опрос недоступен), записи живут не дольше ttl.
+    """
+
+    def __init__(self, versions: MVCache, max_days: int, max_rows: int, ttl: float):
+        self.versions = versions
+        self.ttl = ttl
+        self._entries = BoundedLRU(max_days, max_rows)  # DayKey → (строки, версия)
+        self._keys: Dict[str, List[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: DayKey, version: Optional[str]) -> Optional[List[Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        (rows, stored_version), stored_at = entry
+        if stored_version != version or (version is None and time.monotonic() - stored_at > self.ttl):
+            self._entries.pop(key)
+            return None
+        return rows
+
+    def _set(self, key: DayKey, rows: List[Any], version: Optional[str]) -> None:
+        self._entries.set(key, (rows, version), len(rows))
+
+    def invalidate(self, client: Optional[str] = None) -> None:
+        self._entries.pop_where(lambda k: client is None or k[0] == client)
+
+    def stats(self) -> Dict[str, int]:
+        return {"days": len(self._entries), "rows": self._entries.weight, "hits": self.hits, "misses": self.misses}
+
+    async def fetch(
+        self,
+        session: AsyncSession,
+        dataset: str,
+        from_date: date,
+        to_date: date,
+    ) -> Tuple[List[str], List[Any]]:
+        """
+        Строки датасета за [from_date, to_date] (обе границы включительно)
+        в порядке дней. Возвращает (имена колонок, строки).
+        """
+        spec = DAY_DATASETS[dataset]
+        client = current_client.get()
+        version = self.versions.version(client)
+        today = date.today()
+
+        by_day: Dict[date, List[Any]] = {}
+        missing: List[date] = []
+        day = from_date
+        while day <= to_date:
+            rows = self._get((client, dataset, day), version) if day < today else None
+            if rows is None:
+                missing.append(day)
+            else:
+                by_day[day] = rows
+            day += timedelta(days=1)
+
+        self.hits += len(by_day)
+        self.misses += len(missing)
+
+        for start, end in _runs(missing):
+            upper = end + timedelta(days=1) if spec.exclusive_end else end
+            result = await registry.execute(session, spec.query, from_date=start, to_date=upper)
+            self._keys[dataset] = list(result.keys())
+            fetched: Dict[date, List[Any]] = {d: [] for d in _days(start, end)}
+            index = self._keys[dataset].index(spec.date_field)
+            for row in result.fetchall():
+                fetched.setdefault(row[index], []).append(row)
+            for d, rows in fetched.items():
+                by_day[d] = rows
+                # Пустой день тоже кэшируем — иначе он будет перечитываться
+                if d < today:
+                    self._set((client, dataset, d), rows, version)
+
+        rows = [row for d in sorted(by_day) for row in by_day[d]]
+        return self._keys.get(dataset, []), rows
+
+
+day_cache = DayCache(
+    mv_cache,
+    max_days=settings.DAY_CACHE_MAX_DAYS,
+    max_rows=settings.DAY_CACHE_MAX_ROWS,
+    ttl=settings.MV_CACHE_TTL_SECONDS,
+)
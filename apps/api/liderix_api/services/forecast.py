@@ -0,0 +1,259 @@
+# apps/api/liderix_api/services/forecast.py
+
+import asyncio
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.config import settings
+from liderix_api.queries import registry
+from liderix_api.schemas.analytics import ForecastItem
+from liderix_api.services.mv_cache import mv_cache
+
+# 🔮 Лёгкие модели прогноза, посчитанные пачкой: матрица (ряды × дни),
+# каждая модель — векторные операции по всем рядам сразу. Ряды могут быть
+# любыми (метрики, клиенты) — лишь бы на одном календаре.
+
+MODELS = ("seasonal_naive", "holt_winters", "linear_trend")
+
+SEASON = 7  # недельная сезонность
+
+
+def seasonal_naive(Y: np.ndarray, horizon: int, season: int = SEASON) -> np.ndarray:
+    """Повтор последнего сезона."""
+    last = Y[:, -season:]
+    reps = -(-horizon // season)
+    return np.tile(last, reps)[:, :horizon]
+
+
+def linear_trend(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """МНК-прямая по каждому ряду, в закрытой форме."""
+    T = Y.shape[1]
+    x = np.arange(T, dtype=np.float64)
+    xm = x.mean()
+    ym = Y.mean(axis=1, keepdims=True)
+    slope = ((x - xm) * (Y - ym)).sum(axis=1, keepdims=True) / ((x - xm) ** 2).sum()
+    future = np.arange(T, T + horizon, dtype=np.float64)
+    return ym + slope * (future - xm)
+
+
+def holt_winters(
+    Y: np.ndarray,
+    horizon: int,
+    season: int = SEASON,
+    alpha: float = 0.3,
+    beta: float = 0.05,
+    gamma: float = 0.2,
+) -> np.ndarray:
+    """Аддитивный Holt-Winters; цикл по времени, каждый шаг — по всем рядам."""
+    n, T = Y.shape
+    level = Y[:, :season].mean(axis=1)
+    trend = (Y[:, season:2 * season].mean(axis=1) - level) / season
+    seasonal = Y[:, :season] - level[:, None]
+
+    for t in range(T):
+        s = t % season
+        y = Y[:, t]
+        prev_level = level
+        level = alpha * (y - seasonal[:, s]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        seasonal[:, s] = gamma * (y - level) + (1 - gamma) * seasonal[:, s]
+
+    k = np.arange(1, horizon + 1)
+    return level[:, None] + k * trend[:, None] + seasonal[:, (T + k - 1) % season]
+
+
+def _predict(model: str, Y: np.ndarray, horizon: int) -> np.ndarray:
+    if model == "seasonal_naive":
+        return seasonal_naive(Y, horizon)
+    if model == "holt_winters":
+        return holt_winters(Y, horizon)
+    return linear_trend(Y, horizon)
+
+
+def _available(T: int) -> Tuple[str, ...]:
+    if T >= 2 * SEASON:
+        return MODELS
+    if T >= SEASON:
+        return ("seasonal_naive", "linear_trend")
+    return ("linear_trend",)
+
+
+def forecast_batch(Y: np.ndarray, horizon: int) -> Tuple[np.ndarray, List[str]]:
+    """
+    Прогноз на horizon дней для каждого ряда матрицы Y.
+
+    Модель выбирается по ряду: все модели прогнозируют отложенный хвост
+    (последние min(horizon, T // 4) дней), побеждает минимальная MAE;
+    затем победитель пересчитывается на полной истории. Прогноз не ниже нуля.
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    n, T = Y.shape
+    holdout = max(1, min(horizon, T // 4))
+    train = Y[:, :-holdout]
+    candidates = _available(train.shape[1])
+
+    errors = np.stack([
+        np.abs(_predict(m, train, holdout) - Y[:, -holdout:]).mean(axis=1)
+        for m in candidates
+    ])
+    best = errors.argmin(axis=0)
+
+    # Модели, доступные на обрезанной истории, доступны и на полной
+    forecasts = np.stack([_predict(m, Y, horizon) for m in candidates])
+    result = forecasts[best, np.arange(n)]
+    return np.clip(result, 0, None), [candidates[b] for b in best]
+
+
+# --- Ряды дашборда ---
+
+SERIES = ("revenue", "contracts", "spend", "ads_revenue")
+
+
+FORECAST_ENDPOINT = "analytics.forecast"
+
+
+def _window(history: int) -> Tuple[date, date]:
+    to_date = date.today() - timedelta(days=1)
+    return to_date - timedelta(days=history - 1), to_date
+
+
+async def _load_series(session: AsyncSession, history: int) -> np.ndarray:
+    """Ряды SERIES клиента за history последних полных дней: (len(SERIES), history)."""
+    from_date, to_date = _window(history)
+    rows = await registry.rows(session, "forecast.daily", from_date=from_date, to_date=to_date)
+    Y = np.array([[getattr(r, name) for r in rows] for name in SERIES], dtype=np.float64)
+    return np.nan_to_num(Y).reshape(len(SERIES), len(rows))
+
+
+def _items(Y: np.ndarray, predicted: np.ndarray, models: List[str], horizon: int) -> List[ForecastItem]:
+    """Блок рядов одного клиента (строки — SERIES) → ForecastItem, плюс ROAS."""
+    actual = Y[:, -horizon:].sum(axis=1)
+    future = predicted.sum(axis=1)
+    by_name: Dict[str, Tuple[float, float, str]] = {
+        name: (float(actual[i]), float(future[i]), models[i]) for i, name in enumerate(SERIES)
+    }
+
+    items = [
+        ForecastItem(metric=name, value=v, predicted_value=p, delta=p - v, model=m)
+        for name, (v, p, m) in by_name.items() if name != "ads_revenue"
+    ]
+
+    # ROAS — отношение прогнозов выручки рекламы и расходов, а не отдельный ряд
+    ads_v, ads_p, _ = by_name["ads_revenue"]
+    spend_v, spend_p, _ = by_name["spend"]
+    roas_v = ads_v / spend_v if spend_v else 0.0
+    roas_p = ads_p / spend_p if spend_p else 0.0
+    items.append(ForecastItem(metric="roas", value=roas_v, predicted_value=roas_p, delta=roas_p - roas_v))
+    return items
+
+
+@mv_cache.cached(FORECAST_ENDPOINT)
+async def get_forecast(session: AsyncSession, horizon: int, history: int) -> List[ForecastItem]:
+    """
+    Прогноз выручки, договоров, расходов и ROAS на horizon дней по history
+    последним полным дням. value — факт за последние horizon дней,
+    predicted_value — прогноз на следующие horizon дней.
+    Кэшируется до следующего refresh витрин.
+    """
+    Y = await _load_series(session, history)
+    if Y.shape[1] < 2:
+        return []
+    predicted, models = forecast_batch(Y, horizon)
+    return _items(Y, predicted, models, horizon)
+
+
+async def forecast_all_clients(horizon: int = 14, history: int = 180) -> Dict[str, List[ForecastItem]]:
+    """
+    Ночной пакет: ряды всех клиентов (ITStep + CLIENT_DB_URLS) грузятся
+    параллельно, складываются в одну матрицу (клиенты × SERIES) и считаются
+    одним вызовом forecast_batch. Результаты кладутся в mv_cache под ключом
+    get_forecast без срока — запись живёт до refresh витрин клиента или до
+    следующего пакета, и утренние запросы дашборда отвечают из кэша.
+    Если refresh прошёл после пакета, первый запрос пересчитает прогноз сам.
+    """
+    from liderix_api.tenants import tenants  # tenants → services.auth → db: не на уровне модуля
+
+    clients = [settings.ITSTEP_CLIENT_ID, *tenants.urls]
+
+    async def _load(client: str) -> np.ndarray:
+        async with tenants.read_sessionmaker(client)() as session:
+            return await _load_series(session, history)
+
+    loaded = await asyncio.gather(*(_load(c) for c in clients), return_exceptions=True)
+    blocks: Dict[str, np.ndarray] = {}
+    for client, result in zip(clients, loaded):
+        if isinstance(result, BaseException):
+            print(f"[❌] Forecast series for client {client} failed:", repr(result))
+        elif result.shape[1] >= 2:
+            blocks[client] = result
+    if not blocks:
+        return {}
+
+    # Календарь у всех один (_window, сплошной generate_series) — блоки одной ширины
+    Y = np.vstack(list(blocks.values()))
+    predicted, models = forecast_batch(Y, horizon)
+
+    n = len(SERIES)
+    results: Dict[str, List[ForecastItem]] = {}
+    for k, (client, block) in enumerate(blocks.items()):
+        rows = slice(k * n, (k + 1) * n)
+        results[client] = _items(block, predicted[rows], models[rows], horizon)
+        key = (client, FORECAST_ENDPOINT, (("history", history), ("horizon", horizon)))
+        mv_cache.set(key, results[client], ttl=math.inf)
+    print(f"[🔮] Forecast batch: {len(blocks)} client(s), {Y.shape[0]} series")
+    return results
+
+
+class NightlyForecast:
+    """
+    Раз в сутки, в hour часов (локальное время процесса), считает
+    forecast_all_clients. Кэш в памяти процесса, поэтому пакет идёт
+    здесь же, а не внешним cron.
+    """
+
+    def __init__(self, hour: int, horizon: int, history: int):
+        self.hour = hour
+        self.horizon = horizon
+        self.history = history
+        self._task: Optional[asyncio.Task] = None
+
+    def _seconds_until_run(self) -> float:
+        now = datetime.now()
+        run = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+        if run <= now:
+            run += timedelta(days=1)
+        return (run - now).total_seconds()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._seconds_until_run())
+            try:
+                await forecast_all_clients(self.horizon, self.history)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[❌] Forecast batch failed:", repr(e))
+
+    def start(self) -> None:
+        if self._task is None and 0 <= self.hour <= 23:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+nightly_forecast = NightlyForecast(
+    hour=settings.FORECAST_BATCH_HOUR,
+    horizon=settings.FORECAST_BATCH_HORIZON,
+    history=settings.FORECAST_BATCH_HISTORY,
+)
@@ -0,0 +1,133 @@
+# apps/api/liderix_api/services/funnel.py
+
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.queries import registry
+from liderix_api.config import settings
+from liderix_api.schemas.analytics import FunnelStep, RetentionCohort
+from liderix_api.services.mv_cache import current_client, mv_cache
+
+FUNNEL_STEPS = ("sessions", "leads", "contracts")
+
+
+@mv_cache.cached("analytics.funnel")
+async def get_funnel(session: AsyncSession, from_date: date, to_date: date) -> List[FunnelStep]:
+    """Сессии → лиды → договоры; conversion_rate — доля от предыдущего шага."""
+    row = await registry.one(session, "funnel.totals", from_date=from_date, to_date=to_date)
+    steps: List[FunnelStep] = []
+    prev: Optional[int] = None
+    for name in FUNNEL_STEPS:
+        users = int(getattr(row, name) or 0)
+        if prev is None:
+            rate = 1.0
+        else:
+            rate = users / prev if prev else 0.0
+        steps.append(FunnelStep(step_name=name, users=users, conversion_rate=rate))
+        prev = users
+    return steps
+
+
+# --- Когорты ---
+
+MAX_OFFSET = 4  # week_0 .. week_4 в RetentionCohort
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+class CohortStore:
+    """
+    Матрица когорт клиента в памяти: cohort_week → счётчики по смещениям 0..MAX_OFFSET.
+
+    Первый запрос строит матрицу целиком одним агрегатом. Дальше каждая новая
+    закрытая неделя добавляет одну диагональ — запрос только по клиентам,
+    активным в этой неделе (новая когорта получает week_0, предыдущие четыре —
+    очередную колонку).
+
+    Неделя могла закрыться раньше, чем обновилась недельная витрина, поэтому
+    при смене версии данных (mv_cache.version) последние MAX_OFFSET + 1
+    диагоналей пересчитываются; без версии — не реже раза в MV_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, client: str):
+        self.client = client
+        self.cells: Dict[date, np.ndarray] = {}
+        self.through: Optional[date] = None  # последняя учтённая неделя
+        self.version: Optional[str] = None   # версия данных, с которой считались диагонали
+        self.synced_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def _add(self, rows) -> None:
+        for cohort_week, offset, clients in rows:
+            if 0 <= offset <= MAX_OFFSET:
+                row = self.cells.setdefault(cohort_week, np.zeros(MAX_OFFSET + 1, dtype=np.int64))
+                row[offset] = clients
+
+    async def _diagonal(self, session: AsyncSession, week: date, new: bool) -> None:
+        rows = await registry.rows(session, "cohorts.week", week=week, max_offset=MAX_OFFSET)
+        # Старые значения диагонали обнуляем: клиентов в неделе могло стать меньше
+        for offset in range(MAX_OFFSET + 1):
+            row = self.cells.get(week - timedelta(days=7 * offset))
+            if row is not None:
+                row[offset] = 0
+        if new:
+            # Новая когорта появляется даже без клиентов — с нулём в week_0
+            self.cells.setdefault(week, np.zeros(MAX_OFFSET + 1, dtype=np.int64))
+        self._add(rows)
+
+    def _stale(self, version: Optional[str]) -> bool:
+        if version is None:
+            return time.monotonic() - self.synced_at > settings.MV_CACHE_TTL_SECONDS
+        return version != self.version
+
+    async def sync(self, session: AsyncSession, until: date, rebuild: bool = False) -> None:
+        async with self.lock:
+            version = mv_cache.version(self.client)
+            if rebuild or self.through is None:
+                rows = await registry.rows(session, "cohorts.full", until=until, max_offset=MAX_OFFSET)
+                self.cells = {}
+                self._add(rows)
+                self.through = until
+            else:
+                # Данные обновились — пересчитываем недавние недели, затем добавляем новые
+                week = self.through + timedelta(days=7)
+                if self._stale(version):
+                    week = self.through - timedelta(days=7 * MAX_OFFSET)
+                while week <= until:
+                    await self._diagonal(session, week, new=week > self.through)
+                    self.through = max(self.through, week)
+                    week += timedelta(days=7)
+            self.version = version
+            self.synced_at = time.monotonic()
+
+    def cohorts(self, limit: int) -> List[RetentionCohort]:
+        result = []
+        weeks_known = [w for w in sorted(self.cells) if w <= self.through]
+        for cohort_week in weeks_known[-limit:]:
+            counts = self.cells[cohort_week]
+            # Смещения в будущем ещё не наблюдались — None, а не 0
+            observed = min(MAX_OFFSET, (self.through - cohort_week).days // 7)
+            weeks = {f"week_{k}": int(counts[k]) if k <= observed else None for k in range(MAX_OFFSET + 1)}
+            result.append(RetentionCohort(cohort_week=cohort_week.isoformat(), **weeks))
+        return result
+
+
+_stores: Dict[str, CohortStore] = {}
+
+
+async def get_retention(session: AsyncSession, weeks: int, rebuild: bool = False) -> List[RetentionCohort]:
+    """Последние weeks когорт по закрытым неделям (текущая неделя не входит)."""
+    client = current_client.get()
+    store = _stores.get(client)
+    if store is None:
+        store = _stores[client] = CohortStore(client)
+    until = week_start(date.today()) - timedelta(days=7)
+    await store.sync(session, until, rebuild)
+    return store.cohorts(weeks)
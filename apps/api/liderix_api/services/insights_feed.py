@@ -0,0 +1,120 @@
+# apps/api/liderix_api/services/insights_feed.py
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.config import settings
+from liderix_api.db_client_itstep import SessionItstep
+from liderix_api.queries import registry
+
+class InsightsFeed:
+    """
+    Один фоновый опрос ai.agent_insights на процесс и раздача новых записей
+    подписчикам (SSE). Сколько бы дашбордов ни было открыто, в БД уходит
+    один лёгкий запрос за интервал, а не по запросу на каждый дашборд.
+
+    Подписка — только на одного клиента. У каждого подписчика своя
+    ограниченная очередь: если он не успевает читать, старые события выбрасываются.
+
+    Водяной знак created_at сам по себе теряет строки: транзакция, начатая
+    раньше, может закоммитить запись с меньшим created_at уже после опроса.
+    Поэтому каждый опрос перечитывает окно overlap секунд до водяного знака,
+    а уже отданные id отбрасываются.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float,
+        queue_size: int,
+        overlap: float,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.queue_size = queue_size
+        self.overlap = timedelta(seconds=overlap)
+        self.since: Optional[datetime] = None
+        self._seen: Dict[Hashable, datetime] = {}  # id → created_at в пределах окна
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, client_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(client_id.lower(), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, client_id: str) -> None:
+        key = client_id.lower()
+        queues = self._subscribers.get(key)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[key]
+
+    def subscribers(self) -> int:
+        return sum(len(q) for q in self._subscribers.values())
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(str(event["client_id"]).lower(), ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def poll_once(self) -> int:
+        async with self.session_factory() as session:
+            first = self.since is None
+            if first:
+                # Стартуем с «сейчас»: история отдаётся обычными GET, в ленту — только новое
+                self.since = (await registry.execute(session, "insights.feed.head")).scalar()
+            rows = await registry.rows(session, "insights.feed.since", since=self.since - self.overlap)
+
+        published = 0
+        for row in rows:
+            if row.id in self._seen:
+                continue
+            self._seen[row.id] = row.created_at
+            self.since = max(self.since, row.created_at)
+            if not first:  # строки окна при старте — уже история
+                self.publish(dict(row._mapping))
+                published += 1
+
+        # id старше окна больше не вернутся из запроса — забываем
+        horizon = self.since - self.overlap
+        self._seen = {i: t for i, t in self._seen.items() if t > horizon}
+        return published
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                count = await self.poll_once()
+                if count:
+                    print(f"[📡] Pushed {count} new insight(s) to {self.subscribers()} subscriber(s)")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[❌] Insights feed poll failed:", repr(e))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+insights_feed = InsightsFeed(
+    SessionItstep,
+    interval=settings.INSIGHTS_POLL_SECONDS,
+    queue_size=settings.INSIGHTS_SUBSCRIBER_QUEUE,
+    overlap=settings.INSIGHTS_FEED_OVERLAP_SECONDS,
+)
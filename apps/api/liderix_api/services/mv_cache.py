@@ -0,0 +1,257 @@
+# apps/api/liderix_api/services/mv_cache.py
+
+import asyncio
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.config import settings
+from liderix_api.utils.lru import BoundedLRU
+
+# 🏷 Клиент текущего запроса — часть ключа кэша
+current_client: ContextVar[str] = ContextVar("current_client", default=settings.ITSTEP_CLIENT_ID)
+
+# 🔎 Версия данных: меняется при REFRESH MATERIALIZED VIEW (новый relfilenode)
+# и при любых DML в витринах и ai.agent_insights (счётчики pg_stat)
+DEFAULT_VERSION_SQL = """
+    SELECT md5(COALESCE(string_agg(
+             c.oid::text || ':' || c.relfilenode::text || ':' ||
+             COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)::text,
+             ',' ORDER BY c.oid), ''))
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+    WHERE c.relkind IN ('m', 'r')
+      AND n.nspname IN ('analytics', 'dashboards', 'ai')
+"""
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, Hashable], ...]]
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def _weight(value: Any) -> int:
+    return len(value) if isinstance(value, (list, tuple)) else 1
+
+
+class MVCache:
+    """
+    LRU-кэш результатов запросов к витринам.
+
+    Ключ — (client, endpoint, нормализованные параметры). Размер ограничен
+    числом записей и суммарным числом строк. Записи клиента сбрасываются,
+    когда MVRefreshWatcher видит новую версию данных. Пока версия клиента
+    не известна, записи живут не дольше ttl.
+    """
+
+    def __init__(self, max_entries: int, max_rows: int, ttl: float):
+        self.ttl = ttl
+        self._entries = BoundedLRU(max_entries, max_rows)
+        self._generation: Dict[str, int] = {}
+        self._versions: Dict[str, str] = {}
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, client: str) -> int:
+        return self._generation.get(client, 0)
+
+    def version(self, client: str) -> Optional[str]:
+        """Последняя известная версия данных клиента (None — ещё не опрошена)."""
+        return self._versions.get(client)
+
+    def set_version(self, client: str, version: Optional[str]) -> None:
+        """Фиксирует новую версию данных клиента и сбрасывает его записи."""
+        self.invalidate(client)
+        if version is None:
+            self._versions.pop(client, None)
+        else:
+            self._versions[client] = version
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        (value, ttl), stored_at = entry
+        # ttl — только страховка, пока версия клиента неизвестна (опрос недоступен);
+        # с известной версией запись живёт до следующего refresh
+        if self.version(key[0]) is None and time.monotonic() - stored_at > ttl:
+            self._entries.pop(key)
+            return False, None
+        return True, value
+
+    def set(self, key: CacheKey, value: Any, ttl: Optional[float] = None) -> None:
+        """ttl — свой срок записи вместо self.ttl (math.inf — до refresh или перезаписи)."""
+        self._entries.set(key, (value, self.ttl if ttl is None else ttl), _weight(value))
+
+    def invalidate(self, client: Optional[str] = None) -> None:
+        """Сбрасывает записи клиента (или все, если client не указан)."""
+        self._entries.pop_where(lambda k: client is None or k[0] == client)
+        for c in ([client] if client is not None else list(self._generation)):
+            self._generation[c] = self.generation(c) + 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "rows": self._entries.weight, "hits": self.hits, "misses": self.misses}
+
+    async def get_or_load(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            self.hits += 1
+            return value
+
+        # Одинаковые параллельные запросы ждут один и тот же SQL
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # отменили сам ожидающий запрос
+                # Отменили ведущий запрос (например, таймаут панели) — грузим сами,
+                # его отмена не должна доходить до остальных
+                return await self.get_or_load(key, loader)
+
+        self.misses += 1
+        client = key[0]
+        generation = self.generation(client)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # помечаем как прочитанное, если никто не ждал
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        # Витрина обновилась, пока шёл запрос — результат уже устарел
+        if self.generation(client) == generation:
+            self.set(key, value)
+        return value
+
+    def cached(self, endpoint: str):
+        """
+        Декоратор для async-функций вида f(session, **params).
+        Первый аргумент (сессия) в ключ не входит.
+        """
+        def decorator(fn: Callable[..., Awaitable[Any]]):
+            signature = inspect.signature(fn)
+            first = next(iter(signature.parameters))
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = tuple(sorted(
+                    (name, _normalize(value))
+                    for name, value in bound.arguments.items()
+                    if name != first
+                ))
+                key = (current_client.get(), endpoint, params)
+                return await self.get_or_load(key, lambda: fn(*args, **kwargs))
+
+            return wrapper
+        return decorator
+
+
+class MVRefreshWatcher:
+    """
+    Фоновый опрос версии данных клиентской БД.
+    При смене версии сбрасывает кэш этого клиента.
+
+    settle — задержка сброса в секундах: версия читается с primary, а данные
+    могут читаться с реплики. Сброс сразу после refresh заполнил бы кэш
+    (с новой версией) данными отставшей реплики, поэтому новая версия
+    применяется через settle секунд после первого замеченного изменения.
+    """
+
+    def __init__(
+        self,
+        cache: MVCache,
+        session_factory: Callable[[], AsyncSession],
+        client: str,
+        interval: float,
+        version_sql: str = "",
+        settle: float = 0.0,
+    ):
+        self.cache = cache
+        self.session_factory = session_factory
+        self.client = client
+        self.interval = interval
+        self.version_sql = text(version_sql or DEFAULT_VERSION_SQL)
+        self.settle = settle
+        self.version: Optional[str] = None
+        self._pending: Optional[float] = None  # когда впервые увидели новую версию
+        self._task: Optional[asyncio.Task] = None
+
+    async def poll_once(self) -> Optional[str]:
+        async with self.session_factory() as session:
+            res = await session.execute(self.version_sql)
+            version = res.scalar()
+        version = None if version is None else str(version)
+        if version != self.version and self.settle > 0 and self.version is not None:
+            # Таймер — от первого замеченного изменения: при непрерывной записи
+            # (ETL, агенты) версия меняется каждый опрос, и перезапуск таймера
+            # откладывал бы сброс бесконечно. По истечении — берём последнюю версию.
+            now = time.monotonic()
+            if self._pending is None:
+                self._pending = now
+            if now - self._pending < self.settle:
+                return self.version
+        self._pending = None
+        if version != self.version:
+            if self.version is not None:
+                print(f"[🔄] Data version changed for client {self.client}, dropping cache")
+            self.cache.set_version(self.client, version)
+            self.version = version
+        return version
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[❌] MV refresh poll failed:", repr(e))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+mv_cache = MVCache(
+    max_entries=settings.MV_CACHE_MAX_ENTRIES,
+    max_rows=settings.MV_CACHE_MAX_ROWS,
+    ttl=settings.MV_CACHE_TTL_SECONDS,
+)
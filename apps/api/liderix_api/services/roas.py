@@ -0,0 +1,29 @@
+# apps/api/liderix_api/services/roas.py
+
+from datetime import date
+from typing import List, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.queries import registry
+from liderix_api.schemas.analytics import CampaignROASItem, CustomerMetricsItem
+from liderix_api.services.mv_cache import mv_cache
+
+RoasPeriod = Literal["total", "week", "month"]
+
+
+@mv_cache.cached("analytics.campaign_roas")
+async def get_campaign_roas(
+    session: AsyncSession,
+    from_date: date,
+    to_date: date,
+    period: RoasPeriod = "total",
+) -> List[CampaignROASItem]:
+    """ROAS и CAC по кампаниям: расходы рекламы ↔ выручка и договоры CRM по utm_campaign."""
+    return await registry.models(session, f"roas.campaigns.{period}", from_date=from_date, to_date=to_date)
+
+
+@mv_cache.cached("analytics.customers")
+async def get_customer_metrics(session: AsyncSession, from_date: date, to_date: date) -> List[CustomerMetricsItem]:
+    """Новые / вернувшиеся клиенты, средний чек и CLV по неделям."""
+    return await registry.models(session, "roas.customers", from_date=from_date, to_date=to_date)
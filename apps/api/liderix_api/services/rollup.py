@@ -0,0 +1,68 @@
+# apps/api/liderix_api/services/rollup.py
+
+from datetime import date
+from typing import Dict, Literal, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# 📅 Свёртка посуточного ряда в недели / месяцы / кварталы — векторно, за один проход
+
+Period = Literal["day", "week", "month", "quarter"]
+
+Columns = Dict[str, np.ndarray]
+
+
+def dense_daily(
+    dates: Sequence[date],
+    columns: Mapping[str, Sequence[float]],
+    from_date: date,
+    to_date: date,
+) -> Tuple[np.ndarray, Columns]:
+    """
+    Разреженный ряд (только дни с данными) → сплошной календарь
+    [from_date, to_date] с нулями в пропущенных днях.
+    """
+    days = np.arange(np.datetime64(from_date, "D"), np.datetime64(to_date, "D") + 1)
+    if len(days) == 0:
+        return days, {name: np.zeros(0) for name in columns}
+    idx = (np.asarray(dates, dtype="datetime64[D]") - days[0]).astype(np.int64)
+    inside = (idx >= 0) & (idx < len(days))
+    dense: Columns = {}
+    for name, values in columns.items():
+        col = np.zeros(len(days), dtype=np.float64)
+        # NULL из витрины → NaN → 0
+        values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        np.add.at(col, idx[inside], values[inside])
+        dense[name] = col
+    return days, dense
+
+
+def period_starts(days: np.ndarray, period: Period) -> np.ndarray:
+    """Начало периода для каждого дня (неделя — с понедельника, как date_trunc)."""
+    if period == "day":
+        return days
+    if period == "week":
+        # 1970-01-01 — четверг: (n + 3) % 7 — номер дня недели с понедельника
+        return days - ((days.astype(np.int64) + 3) % 7)
+    months = days.astype("datetime64[M]")
+    if period == "quarter":
+        months = months - (months.astype(np.int64) % 3)
+    return months.astype("datetime64[D]")
+
+
+def rollup(days: np.ndarray, columns: Mapping[str, np.ndarray], period: Period) -> Tuple[np.ndarray, Columns]:
+    """Суммы колонок по периодам. days должны быть отсортированы."""
+    starts = period_starts(days, period)
+    if len(starts) == 0:
+        return starts, {name: np.zeros(0) for name in columns}
+    # Границы групп — там, где меняется начало периода
+    edges = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    return starts[edges], {name: np.add.reduceat(col, edges) for name, col in columns.items()}
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее среднее по последним window точкам; в начале ряда — по доступным."""
+    csum = np.cumsum(np.r_[0.0, values])
+    n = np.arange(1, len(values) + 1)
+    width = np.minimum(n, window)
+    return (csum[n] - csum[n - width]) / width
@@ -1,66 +1,117 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from liderix_api.schemas.sales import SalesAnalyticsResponse, SalesDailyItem, SalesWeeklyItem, SalesByServiceItem, SalesByBranchItem, SalesByUtmItem
+from liderix_api.queries import to_models
+from liderix_api.services.day_cache import day_cache
+from liderix_api.schemas.sales import (
+    SalesAnalyticsResponse,
+    SalesDailyItem,
+    SalesWeeklyItem,
+    SalesPeriodItem,
+    SalesTrendItem,
+    SalesByServiceItem,
+    SalesByBranchItem,
+    SalesByUtmItem,
+)
+from liderix_api.services.sales_breakdown import breakdown_scope, fetch_breakdown
+from liderix_api.services.rollup import dense_daily, moving_average, rollup
 from datetime import date
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SALES_MEASURES = ("contract_count", "total_revenue", "total_first_sum")
+
+
+def build_sales_series(
+    rows: Sequence[Any],
+    from_date: date,
+    to_date: date,
+    ma_window: int = 7,
+) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Все гранулярности страницы продаж из одного посуточного ряда:
+    weekly / monthly / quarterly — суммы по периодам, trend — нарастающие
+    итоги и скользящее среднее выручки. Итоги всех разрезов совпадают,
+    потому что считаются из одних и тех же дней.
+    """
+    columns = list(zip(*rows)) if rows else [[] for _ in range(1 + len(SALES_MEASURES))]
+    fields = rows[0]._fields if rows else ("date",) + SALES_MEASURES
+    data = dict(zip(fields, columns))
+    days, dense = dense_daily(data["date"], {m: data[m] for m in SALES_MEASURES}, from_date, to_date)
+
+    def _period(period: str, start_name: str) -> Dict[str, List[Any]]:
+        starts, sums = rollup(days, dense, period)
+        return {
+            start_name: starts.tolist(),
+            "contract_count": sums["contract_count"].astype(np.int64).tolist(),
+            "total_revenue": sums["total_revenue"].tolist(),
+            "total_first_sum": sums["total_first_sum"].tolist(),
+        }
+
+    revenue = dense["total_revenue"]
+    return {
+        "weekly": _period("week", "week_start"),
+        "monthly": _period("month", "period_start"),
+        "quarterly": _period("quarter", "period_start"),
+        "trend": {
+            "date": days.tolist(),
+            "total_revenue": revenue.tolist(),
+            "revenue_cumulative": np.cumsum(revenue).tolist(),
+            "revenue_ma": moving_average(revenue, ma_window).tolist(),
+            "contracts_cumulative": np.cumsum(dense["contract_count"]).astype(np.int64).tolist(),
+        },
+    }
+
+
+def _models(schema, columns: Dict[str, List[Any]]) -> list:
+    names = list(columns)
+    return [schema.model_validate(dict(zip(names, values))) for values in zip(*columns.values())]
 
 
 async def fetch_sales_analytics(
     db: AsyncSession,
     from_date: Optional[date] = None,
-    to_date: Optional[date] = None
+    to_date: Optional[date] = None,
+    limit: int = 20,
 ) -> SalesAnalyticsResponse:
     try:
         params = {
-            "from": from_date.isoformat() if from_date else "2020-01-01",
-            "to": to_date.isoformat() if to_date else "2100-01-01",
+            "from_date": from_date or date(2020, 1, 1),
+            "to_date": to_date or date(2100, 1, 1),
         }
 
-        # 📆 По дням
-        daily_query = await db.execute(text("""
-            SELECT date, contract_count, total_revenue, total_first_sum
-            FROM dashboards.mv_crm_sales_daily
-            WHERE date BETWEEN :from AND :to
-            ORDER BY date
-        """), params)
-        daily = [SalesDailyItem(**row._mapping) for row in daily_query.fetchall()]
-
-        # 📅 По неделям
-        weekly_query = await db.execute(text("""
-            SELECT week_start, total_revenue
-            FROM dashboards.mv_crm_sales_by_week
-            WHERE week_start BETWEEN :from AND :to
-            ORDER BY week_start
-        """), params)
-        weekly = [SalesWeeklyItem(**row._mapping) for row in weekly_query.fetchall()]
-
-        # 🧾 По услугам
-        by_service_query = await db.execute(text("""
-            SELECT service_id, service_name, contract_count, total_revenue, total_first_sum
-            FROM dashboards.mv_crm_sales_by_service
-        """))
-        by_service = [SalesByServiceItem(**row._mapping) for row in by_service_query.fetchall()]
+        # 📆 По дням — из посуточного кэша; будущих дней в витрине нет
+        last_day = min(params["to_date"], date.today())
+        _, daily_rows = await day_cache.fetch(db, "sales.daily", params["from_date"], last_day)
+        daily = to_models(SalesDailyItem, daily_rows)
+
+        # 📅 Недели / месяцы / кварталы / тренд — из того же ряда, без отдельных запросов
+        series = build_sales_series(daily_rows, params["from_date"], last_day)
+
+        period = (params["from_date"], params["to_date"])
+
+        # 🧾 По услугам — Top-N за период
+        by_service = to_models(SalesByServiceItem, await fetch_breakdown(db, "by_service", *period, limit))
 
         # 🏢 По филиалам
-        by_branch_query = await db.execute(text("""
-            SELECT branch_sk, branch_name, contract_count, total_revenue, total_first_sum
-            FROM dashboards.mv_crm_sales_by_branch
-        """))
-        by_branch = [SalesByBranchItem(**row._mapping) for row in by_branch_query.fetchall()]
+        by_branch = to_models(SalesByBranchItem, await fetch_breakdown(db, "by_branch", *period, limit))
 
         # 🌐 По UTM
-        by_utm_query = await db.execute(text("""
-            SELECT utm_source, utm_medium, utm_campaign, contract_count, total_revenue, total_first_sum
-            FROM dashboards.mv_crm_sales_by_utm
-        """))
-        by_utm = [SalesByUtmItem(**row._mapping) for row in by_utm_query.fetchall()]
+        by_utm = to_models(SalesByUtmItem, await fetch_breakdown(db, "by_utm", *period, limit))
 
-        return SalesAnalyticsResponse(
+        return SalesAnalyticsResponse.model_construct(
             daily=daily,
-            weekly=weekly,
+            weekly=_models(SalesWeeklyItem, series["weekly"]),
+            monthly=_models(SalesPeriodItem, series["monthly"]),
+            quarterly=_models(SalesPeriodItem, series["quarterly"]),
+            trend=_models(SalesTrendItem, series["trend"]),
             byService=by_service,
             byBranch=by_branch,
-            byUtm=by_utm
+            byUtm=by_utm,
+            breakdownScope={
+                "byService": breakdown_scope("by_service"),
+                "byBranch": breakdown_scope("by_branch"),
+                "byUtm": breakdown_scope("by_utm"),
+            },
         )
 
     except Exception as e:
@@ -68,4 +119,4 @@ async def fetch_sales_analytics(
         # Вернуть пустую структуру на случай сбоя
         return SalesAnalyticsResponse(
             daily=[], weekly=[], byService=[], byBranch=[], byUtm=[]
-        )
\ No newline at end of file
+        )
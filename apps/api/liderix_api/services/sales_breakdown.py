@@ -0,0 +1,68 @@
+# apps/api/liderix_api/services/sales_breakdown.py
+
+from datetime import date
+from typing import Dict, Literal, Optional, Sequence, Tuple
+
+from sqlalchemy import Row
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from liderix_api.queries import registry
+from liderix_api.services.mv_cache import current_client, mv_cache
+
+Breakdown = Literal["by_service", "by_branch", "by_utm"]
+BreakdownScope = Literal["range", "all_time"]
+
+UNDEFINED_TABLE = "42P01"
+
+# (client, breakdown) → (есть ли посуточная витрина, версия данных при проверке).
+# После смены версии (refresh / новый DDL из sql/itstep) проверяем заново.
+_range_views: Dict[Tuple[str, str], Tuple[bool, Optional[str]]] = {}
+
+
+def breakdown_scope(breakdown: Breakdown) -> BreakdownScope:
+    """
+    За какой период посчитан разрез текущего клиента: "all_time" — посуточной
+    витрины нет, и цифры за всю историю, а не за запрошенный период.
+    """
+    available, _ = _range_views.get((current_client.get(), breakdown), (True, None))
+    return "range" if available else "all_time"
+
+
+@mv_cache.cached("sales.breakdown")
+async def fetch_breakdown(
+    session: AsyncSession,
+    breakdown: Breakdown,
+    from_date: date,
+    to_date: date,
+    limit: int,
+) -> Sequence[Row]:
+    """
+    Top-N разреза продаж за период из посуточной витрины (день × измерение,
+    DDL — sql/itstep/crm_daily_views.sql). Если витрины *_daily у клиента нет —
+    Top-N за всю историю; ответ помечает это через breakdown_scope().
+    """
+    client = current_client.get()
+    key = (client, breakdown)
+    version = mv_cache.version(client)
+    checked = _range_views.get(key)
+    available = checked[0] if checked and checked[1] == version else None
+    params = dict(from_date=from_date, to_date=to_date, limit=limit)
+
+    if available:
+        return await registry.rows(session, f"sales.{breakdown}.range", **params)
+
+    if available is None:
+        # Первая попытка — под SAVEPOINT, чтобы ошибка не сломала транзакцию сессии
+        try:
+            async with session.begin_nested():
+                rows = await registry.rows(session, f"sales.{breakdown}.range", **params)
+            _range_views[key] = (True, version)
+            return rows
+        except ProgrammingError as e:
+            if getattr(e.orig, "sqlstate", None) != UNDEFINED_TABLE:
+                raise
+            print(f"[⚠️] No daily view for sales.{breakdown}, answering with all-time MV (scope=all_time)")
+            _range_views[key] = (False, version)
+
+    return await registry.rows(session, f"sales.{breakdown}", limit=limit)
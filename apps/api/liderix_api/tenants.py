@@ -0,0 +1,210 @@
+# apps/api/liderix_api/tenants.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, Optional, Set
+
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from liderix_api.config import settings
+from liderix_api.engines import engines
+from liderix_api.services.auth import ALGORITHM, SECRET_KEY
+from liderix_api.services.mv_cache import current_client
+
+
+def normalize_client_id(client_id: str) -> str:
+    """client_id в одном виде для claim, заголовка, CLIENT_DB_URLS и ключей кэша."""
+    return str(client_id).strip().lower()
+
+
+def resolve_client_id(conn: HTTPConnection) -> str:
+    """
+    client_id запроса. Клиент берётся только из claim client_id в JWT —
+    его выдаёт /auth/login по users.client_id. Заголовок X-Client-Id лишь
+    уточняет клиента и должен совпадать с claim: без токена или с чужим
+    клиентом — 401 / 403. Без токена и заголовка — клиент по умолчанию
+    (ITStep), как до появления нескольких клиентов.
+    """
+    requested = conn.headers.get(settings.TENANT_HEADER)
+
+    payload = None
+    auth = conn.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(auth[7:], SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            payload = None
+    claim = payload.get("client_id") if payload else None
+    allowed = normalize_client_id(claim) if claim else settings.ITSTEP_CLIENT_ID
+
+    if requested is None or normalize_client_id(requested) == allowed:
+        return allowed
+    if payload is None:
+        raise HTTPException(401, "Authentication required to select a client")
+    raise HTTPException(403, "No access to this client")
+
+
+@dataclass
+class TenantEngine:
+    engine: AsyncEngine
+    sessions: sessionmaker
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class TenantRouter:
+    """
+    client_id → движок его БД.
+
+    ITStep обслуживает общий пул из engines.py. Остальные клиенты получают
+    движок лениво, при первом запросе, с маленьким пулом. Движков не больше
+    max_engines (LRU), суммарно соединений не больше TENANT_MAX_CONNECTIONS;
+    простаивающие дольше idle_seconds движки закрываются фоновой задачей.
+    """
+
+    def __init__(self, urls: Dict[str, str], idle_seconds: float):
+        self.urls = {normalize_client_id(client_id): url for client_id, url in urls.items()}
+        self.idle_seconds = idle_seconds
+        per_engine = settings.TENANT_POOL_SIZE + settings.TENANT_MAX_OVERFLOW
+        self.max_engines = max(1, min(settings.TENANT_MAX_ENGINES, settings.TENANT_MAX_CONNECTIONS // per_engine))
+        self._engines: "OrderedDict[str, TenantEngine]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._disposing: Set[asyncio.Task] = set()  # ссылки, чтобы задачи не собрал GC
+
+    def known(self, client_id: str) -> bool:
+        return client_id == settings.ITSTEP_CLIENT_ID or client_id in self.urls
+
+    def sessionmaker(self, client_id: str) -> sessionmaker:
+        if client_id == settings.ITSTEP_CLIENT_ID:
+            return engines.sessionmaker("itstep")
+        if client_id not in self.urls:
+            raise HTTPException(404, "Unknown client")
+
+        tenant = self._engines.get(client_id)
+        if tenant is None:
+            engine = create_async_engine(
+                self.urls[client_id],
+                echo=False,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+                pool_size=settings.TENANT_POOL_SIZE,
+                max_overflow=settings.TENANT_MAX_OVERFLOW,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+            )
+            tenant = TenantEngine(engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+            self._engines[client_id] = tenant
+            engines.track(f"tenant:{client_id}", engine)
+            while len(self._engines) > self.max_engines:
+                evicted, old = self._engines.popitem(last=False)
+                print(f"[🧹] Tenant engine LRU full, disposing '{evicted}'")
+                self._dispose(evicted, old)
+        else:
+            self._engines.move_to_end(client_id)
+        tenant.last_used = time.monotonic()
+        return tenant.sessions
+
+    def read_sessionmaker(self, client_id: str):
+        # Реплика есть только у ITStep; остальные клиенты читают со своего пула
+        if client_id == settings.ITSTEP_CLIENT_ID:
+            return engines.read_sessionmaker("itstep")
+        return self.sessionmaker(client_id)
+
+    def _dispose(self, client_id: str, tenant: TenantEngine) -> None:
+        engines.untrack(f"tenant:{client_id}")
+        # Выданные соединения доработают: dispose закрывает только свободные
+        task = asyncio.get_running_loop().create_task(tenant.engine.dispose())
+        self._disposing.add(task)
+        task.add_done_callback(self._disposing.discard)
+
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        idle = [c for c, t in self._engines.items() if now - t.last_used > self.idle_seconds]
+        for client_id in idle:
+            self._dispose(client_id, self._engines.pop(client_id))
+        return len(idle)
+
+    def stats(self) -> Dict[str, int]:
+        return {"engines": len(self._engines), "max_engines": self.max_engines}
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_seconds / 4))
+            evicted = self.evict_idle()
+            if evicted:
+                print(f"[🧹] Disposed {evicted} idle tenant engine(s)")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for client_id in self._engines:
+            engines.untrack(f"tenant:{client_id}")
+        await asyncio.gather(*(t.engine.dispose() for t in self._engines.values()), *self._disposing)
+        self._engines.clear()
+
+
+tenants = TenantRouter(settings.CLIENT_DB_URLS, idle_seconds=settings.TENANT_IDLE_SECONDS)
+
+
+def tenant_sessionmaker() -> sessionmaker:
+    """Фабрика сессий БД клиента текущего запроса (для параллельных секций, выгрузок)."""
+    return tenants.sessionmaker(current_client.get())
+
+
+def tenant_read_sessionmaker():
+    """То же для чтения: реплика клиента, если есть и не отстала, иначе primary."""
+    return tenants.read_sessionmaker(current_client.get())
+
+
+async def get_tenant_session() -> AsyncGenerator[AsyncSession, None]:
+    async with tenant_sessionmaker()() as session:
+        yield session
+
+
+async def get_tenant_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with tenant_read_sessionmaker()() as session:
+        yield session
+
+
+class TenantMiddleware:
+    """
+    Определяет клиента запроса и кладёт его в current_client до остальных
+    middleware и роутов — ключи кэша, ETag и выбор БД идут от него.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        try:
+            client_id = resolve_client_id(HTTPConnection(scope))
+        except HTTPException as e:
+            if scope["type"] == "websocket":
+                await send({"type": "websocket.close", "code": 1008})
+            else:
+                await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+            return
+        token = current_client.set(client_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_client.reset(token)
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+# 📐 Колоночный формат ответа (struct-of-arrays):
+# {"count": N, "columns": {"date": [...], "spend": [...], ...}}
+# Ключи не повторяются в каждой строке, pydantic-модели на строку не создаются.
+
+ResponseFormat = Literal["rows", "columnar"]
+
+
+def _encode_column(values: Sequence[Any]) -> List[Any]:
+    # Тип колонки определяем по первому непустому значению
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, (date, datetime)):
+        return [v.isoformat() if v is not None else None for v in values]
+    if isinstance(sample, Decimal):
+        return [float(v) if v is not None else None for v in values]
+    return list(values)
+
+
+def to_columns(rows: Sequence[Any], columns: Sequence[str]) -> Dict[str, Any]:
+    """Транспонирует строки результата (Row) в колонки с указанными именами."""
+    if not rows:
+        return {"count": 0, "columns": {name: [] for name in columns}}
+    fields = rows[0]._fields
+    transposed = list(zip(*rows))
+    return {
+        "count": len(rows),
+        "columns": {name: _encode_column(transposed[fields.index(name)]) for name in columns},
+    }
+
+
+def section_payload(result: Any, format: ResponseFormat) -> Any:
+    """Секция ответа из результата запроса: список словарей или колонки."""
+    return rows_payload(list(result.keys()), result.fetchall(), format)
+
+
+def rows_payload(keys: Sequence[str], rows: Sequence[Any], format: ResponseFormat) -> Any:
+    """То же для уже прочитанных строк (например, из посуточного кэша)."""
+    if format == "columnar":
+        return to_columns(rows, keys)
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def columns_payload(columns: Dict[str, Sequence[Any]], format: ResponseFormat) -> Any:
+    """Секция, посчитанная в памяти уже по колонкам (например, NumPy-свёртки)."""
+    count = len(next(iter(columns.values()), []))
+    if format == "columnar":
+        return {"count": count, "columns": {name: _encode_column(values) for name, values in columns.items()}}
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def columnar_response(
+    content: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+) -> JSONResponse:
+    # Отдаём Response напрямую — FastAPI не прогоняет его через response_model
+    return JSONResponse(content=content, headers=headers)
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# 🔖 Непрозрачные курсоры для keyset-пагинации:
+# base64url(JSON-список значений ключа сортировки последней строки страницы)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Unsupported cursor value: {type(value).__name__}")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Разбирает курсор и приводит значения к типам ключа. ValueError — если курсор битый."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor shape mismatch")
+        return [cast(v) for cast, v in zip(types, values)]
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def paginate(rows: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Tuple[List[Any], Optional[str]]:
+    """
+    rows запрошены с LIMIT limit + 1: лишняя строка означает, что есть следующая страница.
+    Возвращает (страница, курсор следующей страницы или None).
+    """
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(key(page[-1]))
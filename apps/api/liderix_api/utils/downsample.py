@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: индексы n_out точек, сохраняющих форму ряда.
+
+    Первая и последняя точки всегда остаются. Внутренние точки делятся на
+    n_out - 2 корзины; из каждой берётся точка с наибольшей площадью
+    треугольника (предыдущая выбранная, кандидат, среднее следующей корзины).
+    Средние корзин и площади считаются векторно, цикл идёт только по корзинам.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Границы корзин по внутренним точкам [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[: n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[: n - 1], edges[:-1]) / counts
+    # "Следующая корзина" для последней — сама последняя точка
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs(
+            (x[a] - next_x[b]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y[b] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
@@ -0,0 +1,70 @@
+import hashlib
+from datetime import date
+from typing import Dict, Sequence
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from liderix_api.services.mv_cache import current_client, mv_cache
+
+# ⚠️ Ответ собран не полностью (часть секций упала) — его нельзя кэшировать:
+# с ETag клиент получал бы 304 и держал пустые панели до следующего refresh
+PARTIAL_HEADER = "X-Partial-Sections"
+
+
+def mark_partial(response: Response, errors: Dict[str, str]) -> None:
+    """Помечает ответ с упавшими секциями; ETagMiddleware не выдаст на него ETag."""
+    if errors:
+        response.headers[PARTIAL_HEADER] = ",".join(sorted(errors))
+
+
+def compute_etag(version: str, client: str, request: Request) -> str:
+    # Сегодняшняя дата — часть ключа: эндпоинты подставляют её в диапазон по умолчанию
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    raw = "|".join((version, client, request.url.path, query, date.today().isoformat()))
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """
+    Условные GET-ответы для аналитики.
+
+    ETag строится из версии данных клиента (см. MVRefreshWatcher) и параметров
+    запроса, поэтому его можно проверить до вызова обработчика: при совпадении
+    If-None-Match сразу отдаём 304 — без SQL и без сериализации JSON.
+    Пока версия неизвестна, middleware ничего не делает. Частичные ответы
+    (заголовок PARTIAL_HEADER, см. mark_partial) уходят без ETag и с no-store.
+    """
+
+    def __init__(self, app, prefixes: Sequence[str]):
+        super().__init__(app)
+        self.prefixes = tuple(prefixes)
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if request.method != "GET" or not request.url.path.startswith(self.prefixes):
+            return await call_next(request)
+
+        client = current_client.get()  # выставляет TenantMiddleware
+        version = mv_cache.version(client)
+        if version is None:
+            return await call_next(request)
+
+        etag = compute_etag(version, client, request)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if PARTIAL_HEADER.lower() in response.headers:
+            response.headers["Cache-Control"] = "no-store"
+        elif response.status_code == 200:
+            response.headers.update(headers)
+        return response
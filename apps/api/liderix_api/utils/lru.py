@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple
+
+# 🗃 LRU с двумя лимитами: число записей и суммарный вес (строки).
+# Общее хранилище для MVCache и DayCache — проверку свежести (ttl, версия)
+# делает сам кэш, здесь только учёт веса и вытеснение старейших записей.
+
+
+class BoundedLRU:
+    def __init__(self, max_entries: int, max_weight: int):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self.weight = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """(значение, время записи по monotonic) и отметка использования; None — нет записи."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        value, _, stored_at = entry
+        return value, stored_at
+
+    def set(self, key: Hashable, value: Any, weight: int) -> bool:
+        """Кладёт запись и вытесняет старейшие сверх лимитов. False — запись тяжелее лимита."""
+        if weight > self.max_weight:
+            return False
+        if key in self._entries:
+            self.pop(key)
+        self._entries[key] = (value, weight, time.monotonic())
+        self.weight += weight
+        while len(self._entries) > self.max_entries or self.weight > self.max_weight:
+            self.pop(next(iter(self._entries)))
+        return True
+
+    def pop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[1]
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> List[Hashable]:
+        """Удаляет записи, ключ которых подходит под predicate."""
+        keys = [k for k in self._entries if predicate(k)]
+        for key in keys:
+            self.pop(key)
+        return keys
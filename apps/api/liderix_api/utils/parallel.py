@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SectionJob = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def _run_section(
+    name: str,
+    job: SectionJob,
+    session_factory: Callable[[], AsyncSession],
+    timeout: float,
+) -> Any:
+    # 🔌 Каждая секция берёт своё соединение из пула
+    async def _job() -> Any:
+        async with session_factory() as session:
+            return await job(session)
+
+    return await asyncio.wait_for(_job(), timeout=timeout)
+
+
+async def run_sections(
+    jobs: Dict[str, SectionJob],
+    session_factory: Callable[[], AsyncSession],
+    timeout: float,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Запускает независимые запросы одновременно, каждый на отдельной сессии.
+
+    Возвращает (результаты, ошибки): упавшие или не уложившиеся в timeout
+    секции попадают в ошибки с маркером "timeout" / "error" и не ломают остальные.
+    """
+    names = list(jobs)
+    outcomes = await asyncio.gather(
+        *(_run_section(name, jobs[name], session_factory, timeout) for name in names),
+        return_exceptions=True,
+    )
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            print(f"[⏱] Section '{name}' timed out after {timeout}s")
+            errors[name] = "timeout"
+        elif isinstance(outcome, BaseException):
+            # BaseException, а не Exception: отменённая секция (CancelledError) — тоже ошибка
+            print(f"[❌] Section '{name}' failed:", repr(outcome))
+            errors[name] = "error"
+        else:
+            results[name] = outcome
+    return results, errors
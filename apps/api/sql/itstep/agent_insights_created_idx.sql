@@ -0,0 +1,6 @@
+-- Лента новых инсайтов (/api/insights/stream): insights.feed.since читает
+-- WHERE created_at > :since ORDER BY created_at по всем клиентам, а индекс
+-- agent_insights_client_agent_created_idx начинается с client_id и тут не помогает.
+-- CONCURRENTLY — без блокировки записи агентами; выполнять вне транзакции.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS agent_insights_created_idx
+    ON ai.agent_insights (created_at);
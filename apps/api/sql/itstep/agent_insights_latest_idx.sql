@@ -0,0 +1,5 @@
+-- Последний инсайт на (client_id, agent_name): /api/insights/batch (DISTINCT ON),
+-- /api/insights/sales (ORDER BY created_at DESC LIMIT 1).
+-- CONCURRENTLY — без блокировки записи агентами; выполнять вне транзакции.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS agent_insights_client_agent_created_idx
+    ON ai.agent_insights (client_id, agent_name, created_at DESC);
@@ -0,0 +1,79 @@
+-- Посуточные витрины CRM для разрезов за период:
+--   /api/analytics/sales  byService / byBranch / byUtm (sales.by_*.range)
+--   /api/analytics/roas/campaign-roas                   (roas.campaigns.*)
+--   /api/analytics/funnel/retention, /roas/customers    (cohorts.*, roas.customers)
+-- Без них разрезы продаж отвечают цифрами за всю историю (breakdownScope = "all_time"),
+-- а ROAS / когорты / клиенты — ошибкой.
+--
+-- Источник — таблица договоров, из которой собраны dashboards.mv_crm_sales_*
+-- (одна строка на договор). Её имя задаётся переменной psql:
+--   psql -v crm_contracts=<schema.table> -f crm_daily_views.sql
+-- Ожидаемые колонки: contract_date, client_sk, service_id, service_name,
+-- branch_sk, branch_name, utm_source, utm_medium, utm_campaign, total_sum, first_sum.
+-- Если названия отличаются — поправить SELECT-ы ниже, выходные колонки не менять.
+--
+-- Обновлять вместе с dashboards.mv_crm_sales_daily:
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY dashboards.mv_crm_sales_by_service_daily; (и т.д.)
+-- Уникальные индексы нужны для CONCURRENTLY.
+
+\if :{?crm_contracts}
+\else
+\set crm_contracts dashboards.crm_contracts
+\endif
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboards.mv_crm_sales_by_service_daily AS
+SELECT
+  contract_date::date            AS date,
+  service_id,
+  MAX(service_name)              AS service_name,
+  COUNT(*)::int                  AS contract_count,
+  SUM(total_sum)::numeric        AS total_revenue,
+  SUM(first_sum)::numeric        AS total_first_sum
+FROM :crm_contracts
+GROUP BY 1, service_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_crm_sales_by_service_daily_uidx
+    ON dashboards.mv_crm_sales_by_service_daily (date, service_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboards.mv_crm_sales_by_branch_daily AS
+SELECT
+  contract_date::date            AS date,
+  branch_sk,
+  MAX(branch_name)               AS branch_name,
+  COUNT(*)::int                  AS contract_count,
+  SUM(total_sum)::numeric        AS total_revenue,
+  SUM(first_sum)::numeric        AS total_first_sum
+FROM :crm_contracts
+GROUP BY 1, branch_sk;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_crm_sales_by_branch_daily_uidx
+    ON dashboards.mv_crm_sales_by_branch_daily (date, branch_sk);
+
+-- UTM без значения → '' : NULL не попадает в уникальный индекс и не соединяется по имени кампании
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboards.mv_crm_sales_by_utm_daily AS
+SELECT
+  contract_date::date            AS date,
+  COALESCE(utm_source, '')       AS utm_source,
+  COALESCE(utm_medium, '')       AS utm_medium,
+  COALESCE(utm_campaign, '')     AS utm_campaign,
+  COUNT(*)::int                  AS contract_count,
+  SUM(total_sum)::numeric        AS total_revenue,
+  SUM(first_sum)::numeric        AS total_first_sum
+FROM :crm_contracts
+GROUP BY 1, 2, 3, 4;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_crm_sales_by_utm_daily_uidx
+    ON dashboards.mv_crm_sales_by_utm_daily (date, utm_source, utm_medium, utm_campaign);
+
+-- Активность клиентов по неделям: одна строка на клиента и неделю с договором
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboards.mv_crm_client_activity_weekly AS
+SELECT DISTINCT
+  client_sk,
+  date_trunc('week', contract_date)::date AS week_start
+FROM :crm_contracts
+WHERE client_sk IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_crm_client_activity_weekly_uidx
+    ON dashboards.mv_crm_client_activity_weekly (client_sk, week_start);
+CREATE INDEX IF NOT EXISTS mv_crm_client_activity_weekly_week_idx
+    ON dashboards.mv_crm_client_activity_weekly (week_start);
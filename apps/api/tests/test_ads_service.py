@@ -0,0 +1,20 @@
+import asyncio
+from datetime import date
+
+from liderix_api.services import ads
+
+
+def test_legacy_positional_db_argument_is_accepted(monkeypatch):
+    seen = {}
+
+    async def fake_run_sections(jobs, session_factory, timeout):
+        seen["sections"] = sorted(jobs)
+        seen["session_factory"] = session_factory
+        return {}, {name: "error" for name in jobs}
+
+    monkeypatch.setattr(ads, "run_sections", fake_run_sections)
+    factory = object()
+    result = asyncio.run(ads.fetch_ads_analytics(object(), date(2024, 1, 1), date(2024, 1, 7), session_factory=factory))
+
+    assert seen["session_factory"] is factory
+    assert set(result.errors) == {"daily", "campaigns", "adGroups", "platforms", "utm"}
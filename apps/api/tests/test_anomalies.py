@@ -0,0 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import numpy as np
+
+from liderix_api.services import anomalies
+from liderix_api.services.mv_cache import mv_cache
+from liderix_api.tenants import tenants
+
+TO_DATE = date(2024, 6, 30)
+
+
+def test_scan_fills_cache_and_request_only_reads(monkeypatch):
+    rng = np.random.default_rng(0)
+    series = {}
+    for client, spike in (("a", 50.0), ("b", 0.0)):
+        Y = 100 + rng.normal(0, 1, size=(len(anomalies.SERIES), 150))  # history + days
+        Y[0, -1] += spike  # spend вчера: у клиента a — выброс
+        series[client] = Y
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    loaded = []
+
+    async def fake_load(session, from_date, to_date):
+        client = ("a", "b")[len(loaded)]
+        loaded.append(client)
+        return series[client]
+
+    monkeypatch.setattr(tenants, "read_sessionmaker", lambda client: fake_session)
+    monkeypatch.setattr(anomalies, "_load_series", fake_load)
+    monkeypatch.setattr(mv_cache, "_versions", {"a": "v1", "b": "v1"})
+
+    assert anomalies.get_anomalies("a", TO_DATE, 30) is None
+    asyncio.run(anomalies.scan_clients(["a", "b"], TO_DATE, days=30, history=120, min_score=2.0))
+
+    found = anomalies.get_anomalies("a", TO_DATE, 30, "zscore", 10.0)
+    assert [(a.metric, a.date, a.direction) for a in found] == [("spend", TO_DATE, "up")]
+    assert anomalies.get_anomalies("b", TO_DATE, 30, "zscore", 10.0) == []
+
+    # refresh витрин клиента сбрасывает результат до следующего пакета
+    mv_cache.set_version("a", "v2")
+    assert anomalies.get_anomalies("a", TO_DATE, 30) is None
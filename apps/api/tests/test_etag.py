@@ -0,0 +1,37 @@
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from liderix_api.config import settings
+from liderix_api.services.mv_cache import mv_cache
+from liderix_api.utils.etag import ETagMiddleware, mark_partial
+
+
+def _client(monkeypatch) -> TestClient:
+    monkeypatch.setitem(mv_cache._versions, settings.ITSTEP_CLIENT_ID, "v1")
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware, prefixes=("/api/dashboard",))
+
+    @app.get("/api/dashboard/summary")
+    async def summary(response: Response, fail: bool = False):
+        errors = {"crm": "timeout"} if fail else {}
+        mark_partial(response, errors)
+        return {"crm": None if fail else [], "errors": errors}
+
+    return TestClient(app)
+
+
+def test_full_response_gets_etag_and_304(monkeypatch):
+    client = _client(monkeypatch)
+    first = client.get("/api/dashboard/summary")
+    etag = first.headers["ETag"]
+    second = client.get("/api/dashboard/summary", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+
+
+def test_partial_response_is_not_cacheable(monkeypatch):
+    client = _client(monkeypatch)
+    response = client.get("/api/dashboard/summary", params={"fail": True})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert response.headers["Cache-Control"] == "no-store"
+    assert response.headers["X-Partial-Sections"] == "crm"
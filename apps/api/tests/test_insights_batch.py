@@ -0,0 +1,72 @@
+import uuid
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from liderix_api.db import get_async_session
+from liderix_api.routes.insights.batch import route
+from liderix_api.services.auth import get_current_user
+
+OWN = uuid.uuid4()
+OWNED = uuid.uuid4()
+FOREIGN = uuid.uuid4()
+
+
+class _Result:
+    def __init__(self, values):
+        self._values = values
+
+    def scalars(self):
+        return iter(self._values)
+
+
+class _Session:
+    async def execute(self, statement):
+        return _Result([OWNED])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _client(monkeypatch) -> TestClient:
+    async def fake_rows(session, name, client_ids, agent_names):
+        return [SimpleNamespace(_mapping={"client_id": str(c)}) for c in client_ids]
+
+    monkeypatch.setattr(route.registry, "rows", fake_rows)
+    monkeypatch.setattr(route, "SessionItstepRead", _Session)
+
+    async def fake_session():
+        yield _Session()
+
+    app = FastAPI()
+    app.include_router(route.router, prefix="/api/insights/batch")
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=uuid.uuid4(), client_id=OWN)
+    app.dependency_overrides[get_async_session] = fake_session
+    return TestClient(app)
+
+
+def test_visible_clients_are_returned(monkeypatch):
+    response = _client(monkeypatch).get("/api/insights/batch/", params={"client_id": [str(OWN), str(OWNED)]})
+    assert response.status_code == 200
+    assert {row["client_id"] for row in response.json()} == {str(OWN), str(OWNED)}
+
+
+def test_foreign_client_is_forbidden(monkeypatch):
+    response = _client(monkeypatch).get("/api/insights/batch/", params={"client_id": [str(OWN), str(FOREIGN)]})
+    assert response.status_code == 403
+
+
+def test_malformed_client_id_is_422(monkeypatch):
+    response = _client(monkeypatch).get("/api/insights/batch/", params={"client_id": "not-a-uuid"})
+    assert response.status_code == 422
+
+
+def test_anonymous_request_is_401():
+    app = FastAPI()
+    app.include_router(route.router, prefix="/api/insights/batch")
+    response = TestClient(app).get("/api/insights/batch/", params={"client_id": str(OWN)})
+    assert response.status_code == 401
@@ -0,0 +1,35 @@
+from liderix_api.services import mv_cache as mv_cache_module
+from liderix_api.services.mv_cache import MVCache
+
+
+def _age(monkeypatch, seconds: float) -> None:
+    now = mv_cache_module.time.monotonic()
+    monkeypatch.setattr(mv_cache_module.time, "monotonic", lambda: now + seconds)
+
+
+def test_ttl_expires_entries_without_version(monkeypatch):
+    cache = MVCache(max_entries=10, max_rows=100, ttl=60)
+    key = ("acme", "overview", ())
+    cache.set(key, [1, 2])
+    _age(monkeypatch, 61)
+    assert cache.get(key) == (False, None)
+
+
+def test_known_version_keeps_entries_until_refresh(monkeypatch):
+    cache = MVCache(max_entries=10, max_rows=100, ttl=60)
+    cache.set_version("acme", "v1")
+    key = ("acme", "overview", ())
+    cache.set(key, [1, 2])
+    _age(monkeypatch, 3600)
+    assert cache.get(key) == (True, [1, 2])
+
+    cache.set_version("acme", "v2")
+    assert cache.get(key) == (False, None)
+
+
+def test_per_entry_ttl_outlives_default(monkeypatch):
+    cache = MVCache(max_entries=10, max_rows=100, ttl=60)
+    pinned = ("acme", "analytics.forecast", ())
+    cache.set(pinned, [1], ttl=float("inf"))
+    _age(monkeypatch, 86400)
+    assert cache.get(pinned) == (True, [1])
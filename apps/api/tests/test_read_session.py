@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+
+from liderix_api.engines import EngineRegistry
+
+# Порты, на которых никто не слушает: подключение сразу получает отказ
+PRIMARY_URL = "postgresql+asyncpg://u:p@127.0.0.1:1/db"
+REPLICA_URL = "postgresql+asyncpg://u:p@127.0.0.1:2/db"
+
+
+def _registry():
+    registry = EngineRegistry()
+    registry.register("x", PRIMARY_URL, replica_url=REPLICA_URL)
+    attempts = []
+    for name in ("x", "x.replica"):
+        event.listen(registry.engine(name).sync_engine, "do_connect", lambda *a, name=name: attempts.append(name))
+    return registry, attempts
+
+
+def test_unused_read_session_does_not_connect():
+    registry, attempts = _registry()
+
+    async def run():
+        async with registry.read_session("x"):
+            pass
+
+    asyncio.run(run())
+    assert attempts == []
+
+
+def test_replica_failure_falls_back_to_primary_on_first_use():
+    registry, attempts = _registry()
+
+    async def run():
+        async with registry.read_session("x") as session:
+            async with session.begin_nested():
+                await session.execute(text("SELECT 1"))
+
+    with pytest.raises(OSError):  # primary в тесте тоже недоступен
+        asyncio.run(run())
+    assert attempts == ["x.replica", "x"]
+    assert not registry.replica_available("x")
@@ -0,0 +1,32 @@
+import asyncio
+import json
+from collections import namedtuple
+from datetime import date
+
+from liderix_api.services import sales, sales_breakdown
+from liderix_api.services.mv_cache import current_client
+
+Daily = namedtuple("Daily", "date contract_count total_revenue total_first_sum")
+
+
+def test_breakdown_scope_reaches_json(monkeypatch):
+    async def fake_day_fetch(db, dataset, from_date, to_date):
+        return list(Daily._fields), [Daily(date(2024, 1, 1), 2, 100.0, 50.0)]
+
+    async def fake_breakdown(db, breakdown, from_date, to_date, limit):
+        return []
+
+    monkeypatch.setattr(sales.day_cache, "fetch", fake_day_fetch)
+    monkeypatch.setattr(sales, "fetch_breakdown", fake_breakdown)
+    # У клиента нет посуточной витрины услуг — разрез за всю историю
+    client = current_client.get()
+    monkeypatch.setitem(sales_breakdown._range_views, (client, "by_service"), (False, None))
+
+    result = asyncio.run(sales.fetch_sales_analytics(None, date(2024, 1, 1), date(2024, 1, 1)))
+    payload = json.loads(result.model_dump_json())
+
+    assert payload["breakdownScope"] == {
+        "byService": "all_time",
+        "byBranch": "range",
+        "byUtm": "range",
+    }
@@ -0,0 +1,33 @@
+import asyncio
+
+from liderix_api.tenants import TenantRouter, normalize_client_id
+
+CLIENT = "4F1C2A9E-0000-4000-8000-00000000ABCD"
+URL = "postgresql+asyncpg://u:p@127.0.0.1:1/db"
+
+
+def test_mixed_case_config_key_matches_normalized_claim():
+    router = TenantRouter({CLIENT: URL}, idle_seconds=60)
+
+    async def run():
+        sessions = router.sessionmaker(normalize_client_id(CLIENT))
+        await router.stop()
+        return sessions
+
+    assert router.known(CLIENT.lower())
+    assert asyncio.run(run()) is not None
+
+
+def test_evicted_engines_are_disposed_with_a_held_task():
+    router = TenantRouter({CLIENT: URL}, idle_seconds=0)
+
+    async def run():
+        router.sessionmaker(CLIENT.lower())
+        await asyncio.sleep(0.01)
+        assert router.evict_idle() == 1
+        assert len(router._disposing) == 1
+        await asyncio.gather(*router._disposing)
+        await asyncio.sleep(0)
+        return len(router._disposing)
+
+    assert asyncio.run(run()) == 0